@@ -0,0 +1,523 @@
+# okno gry (tkinter) - ładowane dopiero przez city.main() albo city.CityGUI; rdzeń jest w citycore
+import os
+import time
+from collections import deque
+import tkinter as tk
+from tkinter import ttk, simpledialog, messagebox
+
+import datetime
+from citycore import CityGame, LEGACY_TXT, MANAGERS, UPGRADE_COSTS, offline_progress
+from citycore.autosave import AutoSaver
+from citycore.journal import Journal
+from citycore.saves import SaveManager
+from citycore.scheduler import DayClock, SimWorker, SPEEDS
+from citycore.instrument import Stats, profiled
+from citycore.telemetry import Telemetry
+from citycore.planner import advise, describe
+
+AUTOSAVE_INTERVAL_S = 5.0
+FRAME_MS = 16          # odświeżanie widoku najwyżej raz na klatkę
+LOG_MAX_LINES = 500
+JOURNAL_BASE = "city_journal"
+STATS_FILE = "city_stats.jsonl"
+STATS_PANEL_MS = 500
+
+FONT_MAIN = ("Segoe UI", 10)
+FONT_BIG = ("Segoe UI", 11, 'bold')
+
+
+class CityViewModel:
+    """Teksty widżetów wyliczane ze stanu gry; diff() zwraca tylko to, co się zmieniło od ostatniego razu."""
+
+    def __init__(self):
+        self.shown = {}
+
+    def fields(self, game):
+        req = game.config.prestige_money_req
+        f = {
+            'city': f'Miasto: {game.playername} (Prestige x{1 + game.prestige_points*0.02:.2f})',
+            'day': f'Dzień: {game.day}',
+            'money': f'Pieniądze: {game.money}',
+            'pop': f'Populacja: {game.population}',
+            'happy': f'Szczęście: {game.happiness}',
+            'wood': f'Drewno: {game.wood}',
+            'stone': f'Kamień: {game.stone}',
+            'manager': f'Menadżer: {game.manager} (+{game.manager_bonus}%)',
+            'research': f'Punkty badań: {game.research_points}',
+            'prestige': f'Prestige: {game.prestige_points} pts',
+            # progress to next prestige: based on money requirement (simple)
+            'prestige_max': req,
+            'prestige_value': min(game.money, req),
+        }
+        for k, n in game.buildings.items(): f['b_' + k] = f'Ilość: {n}'
+        return f
+
+    def diff(self, game):
+        changed = [(k, v) for k, v in self.fields(game).items() if self.shown.get(k) != v]
+        self.shown.update(changed)
+        return changed
+
+
+class CityGUI(tk.Tk):
+    def __init__(self, game: CityGame):
+        super().__init__()
+        self.title('City - Prestige & Progression')
+        self.geometry('1020x560')
+        self.resizable(False, False)
+        self.game = game
+        # auto-dzień: zegar o stałym kroku, dni liczone w wątku na forku i przyjmowane co klatkę
+        self.clock = DayClock(); self.sim = SimWorker(); self.auto_after_id = None
+        self._action_seq = 0
+        # zapisy w katalogu saves/ z indeksem; stare city_save_slotN.json przenoszone raz do slotN
+        self.saves = SaveManager(); self.slot = 'slot1'
+        self.saves.import_legacy_slots()
+        # autozapis w osobnym wątku - koniec dnia nie dotyka dysku; slot zapamiętany razem z migawką
+        self.autosaver = AutoSaver(self.saves.save, interval=AUTOSAVE_INTERVAL_S)
+        self.view = CityViewModel()
+        self._log_pending = deque(maxlen=LOG_MAX_LINES); self._refresh_pending = False; self._flush_after_id = None
+        self.create_widgets(); self.refresh_all()
+        self.protocol("WM_DELETE_WINDOW", self.on_quit)
+        if os.path.exists(LEGACY_TXT):
+            root = tk.Tk(); root.withdraw()
+            if messagebox.askyesno('Import','Znaleziono city_save.txt. Zaimportować?'):
+                ok,msg = game.import_legacy_txt();
+                if ok: self.saves.save(game, self.slot); messagebox.showinfo('Import',f'Zaimportowano do {self.slot}')
+            root.destroy()
+        # dziennik dni i akcji (do odtwarzania historii) - zaczyna od pełnego stanu
+        self.journal = Journal(JOURNAL_BASE)
+        self.journal.checkpoint(self.game, 'open')
+
+    def create_widgets(self):
+        style = ttk.Style(self)
+        try: style.theme_use('clam')
+        except: pass
+        style.configure('.', font=FONT_MAIN)
+
+        # statystyki
+        stats = ttk.LabelFrame(self, text='Statystyki', padding=10)
+        stats.place(x=10, y=10, width=320, height=260)
+        self.lbl_city = ttk.Label(stats, text='', font=FONT_BIG); self.lbl_city.pack(anchor='w')
+        self.lbl_day = ttk.Label(stats, text=''); self.lbl_day.pack(anchor='w')
+        self.lbl_money = ttk.Label(stats, text=''); self.lbl_money.pack(anchor='w')
+        self.lbl_pop = ttk.Label(stats, text=''); self.lbl_pop.pack(anchor='w')
+        self.lbl_happy = ttk.Label(stats, text=''); self.lbl_happy.pack(anchor='w')
+        self.lbl_wood = ttk.Label(stats, text=''); self.lbl_wood.pack(anchor='w')
+        self.lbl_stone = ttk.Label(stats, text=''); self.lbl_stone.pack(anchor='w')
+        self.lbl_manager = ttk.Label(stats, text=''); self.lbl_manager.pack(anchor='w')
+        self.lbl_research = ttk.Label(stats, text=''); self.lbl_research.pack(anchor='w')
+        # prestige info
+        self.lbl_prestige = ttk.Label(stats, text='Prestige: 0 pts'); self.lbl_prestige.pack(anchor='w', pady=(6,0))
+        self.prestige_bar = ttk.Progressbar(stats, length=280)
+        self.prestige_bar.pack(anchor='w', pady=(2,0))
+
+        # budynki
+        build_frame = ttk.LabelFrame(self, text='Budynki / Handel', padding=8)
+        build_frame.place(x=340, y=10, width=420, height=520)
+        row = 0; self.build_buttons = {}
+        building_infos = [
+            ('house','Dom (+pop)'),('pavilion','Altana (+szczęście)'),('workshop','Warsztat (+produkcja)'),
+            ('market','Rynek (+mały dochód)'),('farm','Farma (+produkcja)'),('sawmill','Tartak (+drewno)'),
+            ('quarry','Kamieniołom (+kamień)'),('school','Szkoła (+badania)'),('hospital','Szpital (+szczęście)'),
+        ]
+        ttk.Label(build_frame, text='Ile budować:').grid(row=row, column=0, sticky='e')
+        self.build_qty = tk.StringVar(value='1')
+        ttk.Combobox(build_frame, textvariable=self.build_qty, values=['1','10','100','1000','max'], width=8).grid(row=row, column=1, sticky='w', pady=3)
+        row += 1
+        for b_key, label in building_infos:
+            btn = ttk.Button(build_frame, text=f'{label}', command=lambda bk=b_key: self.build(bk))
+            btn.grid(row=row, column=0, sticky='ew', pady=3)
+            lbl = ttk.Label(build_frame, text=f'Ilość: 0', width=12)
+            lbl.grid(row=row, column=1, sticky='w')
+            self.build_buttons[b_key] = lbl
+            row += 1
+        ttk.Separator(build_frame).grid(row=row, column=0, columnspan=2, sticky='ew', pady=8); row += 1
+        ttk.Button(build_frame, text='Sprzedaj zasoby (dynamiczne)', command=self.open_sell_dialog).grid(row=row, column=0, sticky='ew'); row += 1
+        ttk.Button(build_frame, text='Kup zasoby (dynamiczne)', command=self.open_buy_dialog).grid(row=row, column=0, sticky='ew'); row += 1
+
+        # akcje i prawa kolumna
+        right_frame = ttk.LabelFrame(self, text='Działania', padding=8)
+        right_frame.place(x=770, y=10, width=230, height=520)
+        ttk.Button(right_frame, text='Zatrudnij menadżera', command=self.open_hire_manager).pack(fill='x', pady=4)
+        ttk.Button(right_frame, text='Pobierz podatek', command=self.collect_taxes).pack(fill='x', pady=4)
+        ttk.Button(right_frame, text='Zorganizuj festyn', command=self.festival).pack(fill='x', pady=4)
+        ttk.Separator(right_frame).pack(fill='x', pady=6)
+        ttk.Button(right_frame, text='Koniec dnia', command=self.end_day).pack(fill='x', pady=4)
+        ttk.Button(right_frame, text='Toggle Auto-Dzień', command=self.toggle_auto_day).pack(fill='x', pady=4)
+        self.speed_var = tk.StringVar(value=f'{SPEEDS[0]}x')
+        speed_box = ttk.Combobox(right_frame, textvariable=self.speed_var, state='readonly', values=[f'{s}x' for s in SPEEDS])
+        speed_box.pack(fill='x', pady=(0,4)); speed_box.bind('<<ComboboxSelected>>', self.on_speed)
+        ttk.Button(right_frame, text='Prestige (Reset)', command=self.perform_prestige).pack(fill='x', pady=4)
+        ttk.Button(right_frame, text='Zapisz', command=self.save_game).pack(fill='x', pady=4)
+        ttk.Button(right_frame, text='Zapisy...', command=self.open_saves).pack(fill='x', pady=4)
+        ttk.Button(right_frame, text='Nowa gra', command=self.new_game_prompt).pack(fill='x', pady=4)
+        ttk.Separator(right_frame).pack(fill='x', pady=6)
+        ttk.Button(right_frame, text='Ulepszenia', command=self.open_upgrades).pack(fill='x', pady=4)
+        ttk.Button(right_frame, text='Doradca', command=self.show_advice).pack(fill='x', pady=4)
+        ttk.Button(right_frame, text='Questy', command=self.show_quests).pack(fill='x', pady=4)
+        ttk.Button(right_frame, text='Osiągnięcia', command=self.show_achievements).pack(fill='x', pady=4)
+        ttk.Button(right_frame, text='Wydajność', command=self.open_stats_panel).pack(fill='x', pady=4)
+
+        # log
+        log_frame = ttk.LabelFrame(self, text='Log', padding=8)
+        log_frame.place(x=10, y=280, width=320, height=270)
+        self.log_text = tk.Text(log_frame, state='disabled', wrap='word')
+        self.log_text.pack(expand=True, fill='both')
+
+        # klucze view-modelu -> (widget, opcja)
+        self.view_widgets = {
+            'city': (self.lbl_city, 'text'), 'day': (self.lbl_day, 'text'), 'money': (self.lbl_money, 'text'),
+            'pop': (self.lbl_pop, 'text'), 'happy': (self.lbl_happy, 'text'), 'wood': (self.lbl_wood, 'text'),
+            'stone': (self.lbl_stone, 'text'), 'manager': (self.lbl_manager, 'text'),
+            'research': (self.lbl_research, 'text'), 'prestige': (self.lbl_prestige, 'text'),
+            'prestige_max': (self.prestige_bar, 'maximum'), 'prestige_value': (self.prestige_bar, 'value'),
+        }
+        for k, lbl in self.build_buttons.items(): self.view_widgets['b_' + k] = (lbl, 'text')
+
+    # --- market dynamics ---
+    def open_sell_dialog(self):
+        win = tk.Toplevel(self); win.title('Sprzedaj zasoby')
+        ttk.Label(win, text='Zasób:').grid(row=0, column=0)
+        res_var = tk.StringVar(value='wood')
+        ttk.Radiobutton(win, text='Drewno', variable=res_var, value='wood').grid(row=0, column=1)
+        ttk.Radiobutton(win, text='Kamień', variable=res_var, value='stone').grid(row=0, column=2)
+        ttk.Label(win, text='Ilość:').grid(row=1, column=0)
+        qty_var = tk.IntVar(value=100)
+        ttk.Entry(win, textvariable=qty_var).grid(row=1, column=1)
+        price_lbl = ttk.Label(win, text='')
+        price_lbl.grid(row=2, column=0, columnspan=3)
+        def update_price():
+            r = res_var.get(); qty = max(0, qty_var.get())
+            price_lbl.config(text=f'Cena sprzedaży: {self.game.quote("sell", r, qty)}$ (rynek: {self.game.market.mid[r]:.2f}$/szt.)')
+        def do_sell():
+            r = res_var.get(); qty = max(0, qty_var.get())
+            if qty <= 0: return
+            ok, msg = self.game.sell(r, qty)
+            if not ok: messagebox.showinfo('Brak', msg); return
+            self.log(msg); self.journal_action('trade')
+            self.refresh_all(); win.destroy()
+        ttk.Button(win, text='Aktualizuj', command=update_price).grid(row=3, column=0)
+        ttk.Button(win, text='Sprzedaj', command=do_sell).grid(row=3, column=1)
+        update_price()
+
+    def open_buy_dialog(self):
+        win = tk.Toplevel(self); win.title('Kup zasoby')
+        ttk.Label(win, text='Zasób:').grid(row=0, column=0)
+        res_var = tk.StringVar(value='wood')
+        ttk.Radiobutton(win, text='Drewno', variable=res_var, value='wood').grid(row=0, column=1)
+        ttk.Radiobutton(win, text='Kamień', variable=res_var, value='stone').grid(row=0, column=2)
+        ttk.Label(win, text='Ilość:').grid(row=1, column=0)
+        qty_var = tk.IntVar(value=100)
+        ttk.Entry(win, textvariable=qty_var).grid(row=1, column=1)
+        price_lbl = ttk.Label(win, text='')
+        price_lbl.grid(row=2, column=0, columnspan=3)
+        def update_price():
+            r = res_var.get(); qty = max(0, qty_var.get())
+            price_lbl.config(text=f'Cena zakupu: {self.game.quote("buy", r, qty)}$ (rynek: {self.game.market.mid[r]:.2f}$/szt.)')
+        def do_buy():
+            r = res_var.get(); qty = max(0, qty_var.get())
+            if qty <= 0: return
+            ok, msg = self.game.buy(r, qty)
+            if not ok: messagebox.showinfo('Brak', msg); return
+            self.log(msg); self.journal_action('trade')
+            self.refresh_all(); win.destroy()
+        ttk.Button(win, text='Aktualizuj', command=update_price).grid(row=3, column=0)
+        ttk.Button(win, text='Kup', command=do_buy).grid(row=3, column=1)
+        update_price()
+
+    # --- budowanie ---
+    def build(self, kind):
+        # ilość z pola "Ile budować" (liczba albo max) - jedna transakcja, jeden wpis w logu
+        qty = self.build_qty.get().strip().lower()
+        n = 'max' if qty == 'max' else int(qty) if qty.isdigit() else 0
+        ok, msg = self.game.build(kind, n)
+        if not ok: messagebox.showinfo('Brak zasobów', msg); return
+        self.log(msg)
+        self.journal_action('build'); self.refresh_all()
+
+    # --- managerowie ---
+    def open_hire_manager(self):
+        win = tk.Toplevel(self); win.title('Zatrudnij menadżera')
+        ttk.Label(win, text='Wybierz menadżera (koszt zatrudnienia):').pack()
+        sel = tk.IntVar(value=-1)
+        for i,m in enumerate(MANAGERS): ttk.Radiobutton(win, text=f'{m[0]} - koszt {m[2]}$', variable=sel, value=i).pack(anchor='w')
+        def hire():
+            i = sel.get();
+            if i<0: return
+            ok, msg = self.game.hire_manager(i)
+            if not ok: messagebox.showinfo('Brak', msg); return
+            self.log(msg)
+            self.journal_action('manager'); self.refresh_all(); win.destroy()
+        ttk.Button(win, text='Zatrudnij', command=hire).pack(pady=6)
+
+    # --- taxes / festyn ---
+    def collect_taxes(self):
+        tax = simpledialog.askinteger('Podatki','Ile pieniędzy pobrać?',parent=self,minvalue=0)
+        if tax is None: return
+        ok, msg = self.game.collect_taxes(tax)
+        self.log(msg); self.journal_action('taxes'); self.refresh_all()
+
+    def festival(self):
+        ok, msg = self.game.festival()
+        if not ok: messagebox.showinfo('Brak', msg); return
+        self.log(msg); self.journal_action('festival'); self.refresh_all()
+
+    # --- end day / auto-day ---
+    def end_day(self):
+        produced, event_text = self.game.end_day()
+        self._action_seq += 1  # partia auto-dnia policzona przed tym dniem jest nieaktualna
+        self.log(f'Koniec dnia. Produkcja: +{produced.get("money",0)}$, +{produced.get("wood",0)}w, +{produced.get("stone",0)}k. Wydarzenie: {event_text}')
+        self.journal.record_day(self.game, produced)
+        self.autosaver.mark_dirty(self.game, self.slot)
+        err = self.autosaver.pop_error()
+        if err: self.log('Błąd zapisu: '+err)
+        self.refresh_all()
+
+    def toggle_auto_day(self):
+        if not self.clock.running:
+            self.log(f'Auto-dzień WŁĄCZONY ({self.speed_var.get()})'); self.clock.start()
+            if self.auto_after_id is None: self.auto_after_id = self.after(FRAME_MS, self.auto_tick)
+        else:
+            self.log('Auto-dzień WYŁĄCZONY'); self.clock.stop()
+
+    def on_speed(self, _event=None):
+        self.clock.set_speed(int(self.speed_var.get().rstrip('x')))
+        if self.clock.running: self.log(f'Prędkość auto-dnia: {self.speed_var.get()}')
+
+    def auto_tick(self):
+        # co klatkę: przyjmij gotową partię, zleć następną; symulacja nie blokuje okna
+        self.auto_after_id = None
+        batch = self.sim.result()
+        if batch is not None: self.adopt_days(batch)
+        if not self.clock.running and not self.sim.busy: return
+        if self.clock.running and not self.sim.busy:
+            n = self.clock.due()
+            if n:
+                self.sim.submit(self.game, n, token=self._action_seq,
+                                checkpoint_in=self.journal.days_to_checkpoint(), checkpoint_every=self.journal.checkpoint_every)
+        self.auto_after_id = self.after(FRAME_MS, self.auto_tick)
+
+    def adopt_days(self, batch):
+        if batch.source is not self.game or batch.token != self._action_seq:
+            # gracz coś zmienił w trakcie liczenia - dni zostaną policzone jeszcze raz od nowego stanu
+            if self.clock.running: self.clock.refund(len(batch.rows))
+            return
+        t0 = time.perf_counter_ns()
+        # fork niesie stan z chwili zlecenia - pomiary i eksport zostają takie, jakie są teraz w oknie
+        stats, tel = self.game.stats, self.game.telemetry
+        self.game = batch.game; self.game.stats = stats
+        if tel is not None: self.game.telemetry.drain_into(tel); self.game.telemetry = tel
+        for day, roll, produced, text, snap in batch.rows:
+            self.journal.record(day, roll, produced, snap)
+            # jak przy ręcznym końcu dnia: numer dnia po jego zakończeniu, a nie ostatniego dnia partii
+            self.log(f'Koniec dnia. Produkcja: +{produced["money"]}$, +{produced["wood"]}w, +{produced["stone"]}k. Wydarzenie: {text}', day + 1)
+        # autozapis raz na partię, nie raz na dzień
+        self.autosaver.mark_dirty(self.game, self.slot)
+        err = self.autosaver.pop_error()
+        if err: self.log('Błąd zapisu: '+err)
+        self.refresh_all()
+        st = self.game.stats
+        if st is not None: st.add('auto_adopt', time.perf_counter_ns() - t0); st.count('auto_batches')
+
+    # --- save/load ---
+    def save_game(self, slot=None):
+        # zaległy autozapis trafia jeszcze do starego slotu (slot jest w migawce), potem przełączamy
+        self.autosaver.flush()
+        if slot: self.slot = slot
+        ok,msg = self.autosaver.flush(self.game, self.slot)
+        if ok: self.log(msg); messagebox.showinfo('Zapis',msg)
+        else: self.log('Błąd zapisu: '+msg); messagebox.showerror('Błąd zapisu',msg)
+
+    def load_game(self, slot):
+        self.autosaver.flush()
+        ok,msg = self.saves.load(slot, self.game)
+        if ok: self.slot = slot
+        if ok:
+            self.log(msg); self.journal_action('load')
+            off = offline_progress(self.game)
+            if off:
+                p = off['produced']; ev = off['events']
+                msg += (f"\nOffline: {off['days']} dni" + (f" (z {off['missed_days']}, limit)" if off['capped'] else '') +
+                        f"\nProdukcja: +{p['money']}$, +{p['wood']}w, +{p['stone']}k" +
+                        f"\nWydarzenia: pożary {ev['fire']}, dobre lata {ev['good_year']}, migracje {ev['migration']}, skandale {ev['scandal']}")
+                self.log(f"Postęp offline: {off['days']} dni, +{p['money']}$, +{p['wood']}w, +{p['stone']}k")
+                self.journal_action('fast_forward')
+            messagebox.showinfo('Wczytano',msg); self.refresh_all()
+        else: self.log('Błąd wczytania: '+msg); messagebox.showerror('Błąd',msg)
+
+    def open_saves(self):
+        # lista z samego indeksu - pliki zapisów czytane dopiero po wybraniu slotu
+        win = tk.Toplevel(self); win.title('Zapisy'); win.geometry('640x360')
+        cols = (('slot','Slot',110), ('name','Miasto',140), ('day','Dzień',60), ('money','Pieniądze',100),
+                ('prestige','Prestige',60), ('saved_at','Zapisano',130))
+        tree = ttk.Treeview(win, columns=[c for c, _, _ in cols], show='headings', selectmode='browse')
+        for c, title, w in cols: tree.heading(c, text=title); tree.column(c, width=w, anchor='w')
+        tree.pack(expand=True, fill='both')
+        def fill():
+            tree.delete(*tree.get_children())
+            for e in self.saves.list():
+                when = datetime.datetime.fromtimestamp(e['saved_at']).strftime('%Y-%m-%d %H:%M') if e.get('saved_at') else '-'
+                tree.insert('', 'end', iid=e['slot'], values=(e['slot'], e['name'], e['day'], e['money'], e['prestige'], when))
+        def selected():
+            sel = tree.selection(); return sel[0] if sel else None
+        def do_load():
+            slot = selected()
+            if slot: win.destroy(); self.load_game(slot)
+        def do_save_as():
+            slot = simpledialog.askstring('Zapisz jako', 'Nazwa slotu (litery, cyfry, - _):', parent=win,
+                                          initialvalue=self.saves.new_slot())
+            if slot: self.save_game(slot); fill()
+        def do_delete():
+            slot = selected()
+            if not slot or not messagebox.askyesno('Usuń', f'Usunąć zapis {slot}?', parent=win): return
+            ok, msg = self.saves.delete(slot); self.log(msg); fill()
+        bar = ttk.Frame(win); bar.pack(fill='x')
+        ttk.Button(bar, text='Wczytaj', command=do_load).pack(side='left', padx=4, pady=4)
+        ttk.Button(bar, text='Zapisz jako...', command=do_save_as).pack(side='left', padx=4, pady=4)
+        ttk.Button(bar, text='Usuń', command=do_delete).pack(side='left', padx=4, pady=4)
+        ttk.Label(bar, text=f'Bieżący slot: {self.slot}').pack(side='right', padx=8)
+        tree.bind('<Double-1>', lambda e: do_load())
+        fill()
+
+    # --- upgrades (non-modal logging) ---
+    def open_upgrades(self):
+        win = tk.Toplevel(self); win.title('Ulepszenia'); win.geometry('360x220')
+        ttk.Label(win, text=f'Punkty badań: {self.game.research_points}').pack(pady=6)
+        def buy(name):
+            ok, msg = self.game.buy_upgrade(name)
+            self.log(msg)
+            if ok: self.journal_action('upgrade'); self.refresh_all()
+        for name, label in (('better_tools','Better Tools'), ('market_reforms','Market Reforms'),
+                            ('reduced_build_costs','Reduced Build Costs'), ('manager_prod','Manager Production')):
+            ttk.Button(win, text=f'{label} ({UPGRADE_COSTS[name]} pkt)', command=lambda n=name: buy(n)).pack(fill='x',padx=12,pady=6)
+
+    # --- quests / achievements ---
+    def show_quests(self):
+        win = tk.Toplevel(self); win.title('Questy'); win.geometry('420x260')
+        for qid,q in self.game.quests.items():
+            status = 'ZROBIONE' if q.get('done') else 'AKTYWNE'
+            ttk.Label(win, text=f"{q['desc']} - {status}").pack(anchor='w', padx=8, pady=2)
+
+    def show_achievements(self):
+        ach = '\n'.join(sorted(list(self.game.achievements))) or 'Brak'
+        messagebox.showinfo('Osiągnięcia', ach)
+
+    # --- doradca (citycore.planner) ---
+    def show_advice(self):
+        r = advise(self.game)
+        lines = [f'Następny krok: {r["text"]}']
+        if r['prestige_day'] is not None:
+            lines.append(f'Prestiż dnia {r["prestige_day"]}: ~{r["rate"] * 1000:.2f} pkt na 1000 dni')
+        for day, action in r['plan'][:5]: lines.append(f'  dzień {day}: {describe(action)}')
+        messagebox.showinfo('Doradca', '\n'.join(lines))
+
+    # --- prestige UI ---
+    def perform_prestige(self):
+        if not self.game.can_prestige(): messagebox.showinfo('Prestige', 'Nie masz jeszcze wymagan, zebrać wiecej!'); return
+        pts = self.game.prestige_value_if_reset()
+        if not messagebox.askyesno('Prestige', f'Prestige da ci {pts} punktów. Potwierdzić reset?'):
+            return
+        ok, msg = self.game.do_prestige()
+        if ok:
+            messagebox.showinfo('Prestige', msg)
+            self.log(msg)
+            self.journal_action('prestige')
+            self.refresh_all()
+        else:
+            messagebox.showinfo('Prestige', msg)
+
+    # --- utilities ---
+    def journal_action(self, action):
+        # akcje gracza nie są odtwarzane z dziennika - zapisujemy pełny stan po nich
+        self._action_seq += 1
+        self.journal.checkpoint(self.game, action)
+
+    def log(self, text, day=None):
+        # linie trafiają do bufora i są wstawiane hurtem raz na klatkę; day = dzień z wiersza partii
+        self._log_pending.append(f'[Dzień {self.game.day if day is None else day}] {text}\n')
+        self._schedule_flush()
+
+    def refresh_all(self):
+        self._refresh_pending = True
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        if self._flush_after_id is None:
+            self._flush_after_id = self.after(FRAME_MS, self._flush_view)
+
+    def _flush_view(self):
+        self._flush_after_id = None
+        t0 = time.perf_counter_ns()
+        st = self.game.stats
+        if self._refresh_pending:
+            self._refresh_pending = False
+            changed = self.view.diff(self.game)
+            for key, value in changed:
+                widget, option = self.view_widgets[key]
+                widget[option] = value
+            if st is not None: st.count('ui_widgets', len(changed))
+        if st is not None and self._log_pending: st.count('log_lines', len(self._log_pending))
+        if self._log_pending:
+            lines = ''.join(self._log_pending); self._log_pending.clear()
+            self.log_text.config(state='normal')
+            self.log_text.insert('end', lines)
+            # log jako bufor cykliczny: najstarsze linie wylatują
+            excess = int(self.log_text.index('end-1c').split('.')[0]) - 1 - LOG_MAX_LINES
+            if excess > 0: self.log_text.delete('1.0', f'{excess + 1}.0')
+            self.log_text.see('end')
+            self.log_text.config(state='disabled')
+        if st is not None: st.add('ui_refresh', time.perf_counter_ns() - t0)
+
+    # --- pomiary wydajności (włączone tylko przy otwartym panelu) ---
+    def open_stats_panel(self):
+        if self.game.stats is None: self.game.stats = Stats()
+        win = tk.Toplevel(self); win.title('Wydajność'); win.geometry('560x380')
+        text = tk.Text(win, font=('Consolas', 9), wrap='none'); text.pack(expand=True, fill='both')
+        bar = ttk.Frame(win); bar.pack(fill='x')
+        ttk.Button(bar, text=f'Zrzut do {STATS_FILE}',
+                   command=lambda: self.game.stats.dump(STATS_FILE, source='gui', day=self.game.day)).pack(side='left', padx=4, pady=4)
+        ttk.Button(bar, text='Wyzeruj', command=lambda: self.game.stats.reset()).pack(side='left', padx=4, pady=4)
+        def update():
+            if not win.winfo_exists() or self.game.stats is None: return
+            text.delete('1.0', 'end'); text.insert('1.0', self.game.stats.format())
+            win.after(STATS_PANEL_MS, update)
+        def close():
+            self.game.stats = None; win.destroy()
+        win.protocol("WM_DELETE_WINDOW", close)
+        update()
+
+    def new_game_prompt(self):
+        name = simpledialog.askstring('Nowa gra','Podaj nazwę miasta:',parent=self)
+        if name:
+            stats, tel = self.game.stats, self.game.telemetry
+            self.game = CityGame(self.game.config); self.game.playername=name; self.game.stats = stats; self.game.telemetry = tel
+            self.log(f'Nowa gra: {name}')
+            self.journal_action('new_game'); self.refresh_all()
+
+    def on_quit(self):
+        if messagebox.askyesno('Wyjście',f'Zapisać do slotu {self.slot} przed wyjściem?'):
+            self.autosaver.mark_dirty(self.game, self.slot)
+        # dopisz zaległy autozapis zanim zamkniemy okno
+        self.clock.stop(); self.sim.close()
+        ok, msg = self.autosaver.close()
+        if not ok: messagebox.showerror('Błąd zapisu', msg)
+        self.journal.close()
+        if self.game.telemetry is not None: self.game.telemetry.close()
+        self.destroy()
+
+
+def run(game=None):
+    """Otwiera okno gry i kręci pętlę Tk (wywoływane przez city.main)."""
+    if game is None: game = CityGame()
+    # CITY_TELEMETRY=plik.ctel|plik.csv - eksport dni całej sesji (citycore.telemetry)
+    if os.environ.get('CITY_TELEMETRY'):
+        game.telemetry = Telemetry(os.environ['CITY_TELEMETRY'])
+    app = CityGUI(game)
+    # CITY_PROFILE=cprofile|sample [CITY_PROFILE_OUT=plik] - cała sesja pod profilerem
+    if os.environ.get('CITY_PROFILE'):
+        with profiled(os.environ['CITY_PROFILE'], os.environ.get('CITY_PROFILE_OUT')): app.mainloop()
+    else:
+        app.mainloop()
+
+
+if __name__ == '__main__':
+    run()
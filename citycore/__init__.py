@@ -0,0 +1,6 @@
+# rdzeń gry bez zależności od tkinter - można go importować w symulacjach i skryptach
+from .game import (CityGame, GameConfig, SAVE_SLOTS, LEGACY_TXT, MARKET_BASE, BUY_SPREAD, SELL_SPREAD,
+                   PRESTIGE_MONEY_REQ, PRESTIGE_POP_REQ, PRODUCTION, BUILD_COSTS, UPGRADE_COSTS,
+                   MANAGERS)
+from .sim import simulate
+from .fastforward import fast_forward, offline_progress
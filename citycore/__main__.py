@@ -0,0 +1,22 @@
+# python -m citycore DNI [--seed N] [--load plik] [--save plik] [--fast]
+# python -m citycore convert ŹRÓDŁO CEL [--zlib] | savebench
+# python -m citycore bench [--quick] [--baseline [PLIK]] [--save-baseline [PLIK]]
+# python -m citycore telemetry PLIK.ctel [--csv PLIK.csv]
+# python -m citycore vecsim [--cities N] [--days N]
+import sys
+
+from . import binfmt
+from .sim import main
+
+if sys.argv[1:2] in (['convert'], ['savebench']):
+    sys.exit(binfmt.main(sys.argv[1:]))
+if sys.argv[1:2] == ['bench']:
+    from .bench import main as bench_main
+    sys.exit(bench_main(sys.argv[2:]))
+if sys.argv[1:2] == ['vecsim']:
+    from .vecsim import main as vecsim_main
+    sys.exit(vecsim_main(sys.argv[2:]))
+if sys.argv[1:2] == ['telemetry']:
+    from .telemetry import main as telemetry_main
+    sys.exit(telemetry_main(sys.argv[2:]))
+sys.exit(main())
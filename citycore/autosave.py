@@ -0,0 +1,79 @@
+# autozapis w tle: GUI tylko oddaje tani fork() stanu, wątek zapisuje najnowszy co `interval` sekund
+import threading
+import time
+
+
+class AutoSaver:
+    def __init__(self, target, interval=5.0):
+        # target: nazwa pliku albo funkcja game -> (ok, msg); z `dest` (np. slot SaveManager) wołana jako
+        # target(game, dest) - dest jest brany w chwili zrobienia migawki, nie zapisu
+        self.target = target
+        self.interval = interval
+        self._pending = None
+        self._error = None
+        self._stop = False
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._last_write = 0.0
+        self._seq = 0
+        self._written_seq = 0
+        self._busy = False     # wątek zdjął migawkę i ją zapisuje
+        self._thread = threading.Thread(target=self._run, name='autosave', daemon=True)
+        self._thread.start()
+
+    def mark_dirty(self, game, dest=None):
+        # starsze niezapisane migawki są po prostu zastępowane (coalescing)
+        with self._cond:
+            self._seq += 1
+            self._pending = (self._seq, game.fork(), dest)
+            self._cond.notify_all()
+
+    def pop_error(self):
+        with self._cond:
+            err, self._error = self._error, None
+        return err
+
+    def flush(self, game=None, dest=None):
+        """Zapisuje od razu (w bieżącym wątku) oczekującą migawkę lub podaną grę.
+        Najpierw czeka, aż wątek skończy zapis, który już zaczął."""
+        with self._cond:
+            while self._busy: self._cond.wait()
+            if game is not None:
+                self._seq += 1
+                self._pending = (self._seq, game.fork(), dest)
+            item, self._pending = self._pending, None
+        if item is None: return True, 'Brak zmian do zapisu.'
+        return self._write(*item)
+
+    def close(self):
+        with self._cond:
+            self._stop = True
+            self._cond.notify()
+        self._thread.join()
+        return self.flush()
+
+    def _write(self, seq, snap, dest):
+        with self._io_lock:
+            # wątek mógł wziąć starszą migawkę zanim flush() zapisał nowszą - nie nadpisujemy
+            if seq <= self._written_seq: return True, 'Pominięto starszą migawkę.'
+            if not callable(self.target): ok, msg = snap.save(self.target)
+            else: ok, msg = self.target(snap) if dest is None else self.target(snap, dest)
+            self._written_seq = seq
+            self._last_write = time.monotonic()
+        if not ok:
+            with self._cond: self._error = msg
+        return ok, msg
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stop:
+                    wait = self._last_write + self.interval - time.monotonic()
+                    if self._pending is not None and wait <= 0: break
+                    self._cond.wait(wait if self._pending is not None else None)
+                if self._stop: return
+                item, self._pending = self._pending, None
+                self._busy = True
+            try: self._write(*item)
+            finally:
+                with self._cond: self._busy = False; self._cond.notify_all()
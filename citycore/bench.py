@@ -0,0 +1,218 @@
+# benchmarki rdzenia i zapisów: python -m citycore bench [--quick] [--save-baseline PLIK] [--baseline PLIK]
+# Każdy przypadek mierzony na kilku stanach miasta (wczesna gra, późna gra, po prestiżu):
+# operacje/s, percentyle czasu jednego wywołania i szczyt pamięci (tracemalloc).
+# --startup: czas zimnego importu rdzenia (i launchera city.py) w świeżym interpreterze
+# oraz sprawdzenie, że żaden z nich nie wczytuje tkinter.
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from .game import CityGame
+from .sim import simulate
+
+BASELINE = 'bench_baseline.json'
+REGRESSION = 0.10          # spadek ops/s o więcej niż 10% = regresja
+SAMPLE_NS = 200_000        # jedna próbka trwa co najmniej tyle (wiele wywołań naraz dla szybkich operacji)
+STARTUP_MODULES = ('citycore', 'city', 'citycore.sim', 'citycore.saves', 'citycore.sweep')
+STARTUP_CHILD = ('import sys, time; t = time.perf_counter(); import {mod}; '
+                 'print(time.perf_counter() - t, "tkinter" in sys.modules)')
+
+
+def fixture_early():
+    return CityGame(seed=1)
+
+
+def fixture_late():
+    g = CityGame(seed=2)
+    for k, n in dict(house=4000, pavilion=300, workshop=2500, market=800, farm=3000, sawmill=1500,
+                     quarry=1200, school=400, hospital=200).items():
+        g.buildings[k] = n
+    for k in g.upgrades: g.upgrades[k] = True
+    g.manager = 'Ekspert'; g.manager_bonus = 25
+    simulate(3000, game=g)
+    return g
+
+
+def fixture_prestige():
+    g = fixture_late()
+    g.money = max(g.money, g.config.prestige_money_req)
+    g.do_prestige()
+    for k, n in dict(house=40, workshop=15, farm=20, sawmill=8, quarry=5).items(): g.buildings[k] = n
+    simulate(200, game=g)
+    return g
+
+
+FIXTURES = {'early': fixture_early, 'late': fixture_late, 'prestige': fixture_prestige}
+
+
+def legacy_txt(game):
+    keys = ('playername', 'day', 'money', 'population', 'happiness', 'wood', 'stone', 'manager')
+    lines = [f'{k}={getattr(game, k)}' for k in keys] + [f'workshop={game.buildings["workshop"]}']
+    return '\n'.join(lines) + '\n'
+
+
+def cases(game, tmp):
+    """Nazwa -> funkcja bez argumentów. Każda pracuje na własnym forku, fixture zostaje nietknięta."""
+    g = game.fork()
+    d = game.to_dict()
+    paths = {ext: os.path.join(tmp, 'bench' + ext) for ext in ('.json', '.city', '.txt')}
+    game.save(paths['.json']); game.save(paths['.city'])
+    with open(paths['.txt'], 'w', encoding='utf-8') as f: f.write(legacy_txt(game))
+    target = CityGame()
+    return {
+        'production_day': g.production_day,
+        'end_day': g.end_day,
+        'check_quests': g.check_quests,
+        'to_dict': game.to_dict,
+        'from_dict': lambda: target.from_dict(d),
+        'save_json': lambda: game.fork().save(paths['.json']),
+        'save_city': lambda: game.fork().save(paths['.city']),
+        'load_json': lambda: target.load(paths['.json']),
+        'load_city': lambda: target.load(paths['.city']),
+        'import_legacy_txt': lambda: target.import_legacy_txt(paths['.txt']),
+    }
+
+
+def _percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def measure(fn, budget_s):
+    # kalibracja: ile wywołań w jednej próbce
+    inner = 1
+    while True:
+        t = time.perf_counter_ns()
+        for _ in range(inner): fn()
+        if time.perf_counter_ns() - t >= SAMPLE_NS or inner >= 1 << 16: break
+        inner *= 2
+    samples = []; calls = 0
+    deadline = time.perf_counter_ns() + int(budget_s * 1e9)
+    total = 0
+    while not samples or time.perf_counter_ns() < deadline:
+        t = time.perf_counter_ns()
+        for _ in range(inner): fn()
+        dt = time.perf_counter_ns() - t
+        samples.append(dt / inner); total += dt; calls += inner
+    samples.sort()
+    # szczyt pamięci osobno - tracemalloc spowalnia, nie może psuć pomiaru czasu
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    for _ in range(inner): fn()
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return {
+        'ops': calls / (total / 1e9),
+        'p50_us': _percentile(samples, 0.50) / 1000,
+        'p90_us': _percentile(samples, 0.90) / 1000,
+        'p99_us': _percentile(samples, 0.99) / 1000,
+        'peak_kib': peak / 1024,
+        'calls': calls,
+    }
+
+
+def measure_startup(module, runs):
+    """Zimny import modułu w świeżym interpreterze - sam import, bez startu Pythona."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    samples = []; tk = False
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', STARTUP_CHILD.format(mod=module)], cwd=root,
+                             capture_output=True, text=True, check=True).stdout.split()
+        samples.append(float(out[0]) * 1e9); tk = tk or out[1] == 'True'
+    samples.sort()
+    return {
+        'ops': len(samples) / (sum(samples) / 1e9),
+        'p50_us': _percentile(samples, 0.50) / 1000,
+        'p90_us': _percentile(samples, 0.90) / 1000,
+        'p99_us': _percentile(samples, 0.99) / 1000,
+        'peak_kib': 0.0,
+        'calls': runs,
+        'tkinter': tk,
+    }
+
+
+def run(budget_s=0.3, only=None, fixtures=None, startup_runs=0):
+    """Wyniki {'fixture/przypadek': {...}} dla wybranych fixture i przypadków (only = podciąg nazwy).
+
+    fixtures=None = wszystkie; startup_runs > 0 dodaje przypadki 'startup/<moduł>'.
+    """
+    results = {}
+    for mod in STARTUP_MODULES if startup_runs else ():
+        key = f'startup/{mod}'
+        if not only or only in key: results[key] = measure_startup(mod, startup_runs)
+    tmp = tempfile.mkdtemp(prefix='citybench')
+    try:
+        for fname in FIXTURES if fixtures is None else fixtures:
+            game = FIXTURES[fname]()
+            for cname, fn in cases(game, tmp).items():
+                key = f'{fname}/{cname}'
+                if only and only not in key: continue
+                results[key] = measure(fn, budget_s)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return results
+
+
+def save_baseline(results, path=BASELINE):
+    meta = {'python': platform.python_version(), 'machine': platform.machine(), 'time': int(time.time())}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'meta': meta, 'results': results}, f, indent=1, sort_keys=True)
+
+
+def compare(results, baseline, threshold=REGRESSION):
+    """Lista (klucz, ops_teraz, ops_baseline, zmiana) - zmiana < -threshold to regresja."""
+    rows = []
+    for key, r in results.items():
+        old = baseline.get(key)
+        if old is None: rows.append((key, r['ops'], None, None)); continue
+        rows.append((key, r['ops'], old['ops'], r['ops'] / old['ops'] - 1))
+    return rows
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog='python -m citycore bench', description='Benchmarki rdzenia gry i zapisów.')
+    ap.add_argument('--quick', action='store_true', help='krótki pomiar (0.05 s na przypadek)')
+    ap.add_argument('--budget', type=float, default=0.3, help='sekund na przypadek')
+    ap.add_argument('--only', help='tylko przypadki zawierające ten tekst, np. late/ albo save')
+    ap.add_argument('--fixture', action='append', choices=list(FIXTURES))
+    ap.add_argument('--startup', action='store_true',
+                    help='czas zimnego importu rdzenia (bez fixture, chyba że podano --fixture)')
+    ap.add_argument('--baseline', nargs='?', const=BASELINE, help='porównaj z zapisanym baseline')
+    ap.add_argument('--save-baseline', nargs='?', const=BASELINE, help='zapisz wyniki jako baseline')
+    ap.add_argument('--threshold', type=float, default=REGRESSION)
+    ap.add_argument('--json', action='store_true', help='wyniki jako JSON na stdout')
+    args = ap.parse_args(argv)
+    budget = 0.05 if args.quick else args.budget
+    fixtures = args.fixture or ([] if args.startup else None)
+    results = run(budget, args.only, fixtures, max(5, int(budget * 40)) if args.startup else 0)
+    if args.json:
+        json.dump(results, sys.stdout, indent=1); print()
+    else:
+        print(f'{"przypadek":32} {"ops/s":>12} {"p50 us":>9} {"p90 us":>9} {"p99 us":>9} {"pamięć KiB":>11}')
+        for key, r in results.items():
+            print(f'{key:32} {r["ops"]:12.0f} {r["p50_us"]:9.2f} {r["p90_us"]:9.2f} {r["p99_us"]:9.2f} {r["peak_kib"]:11.1f}')
+    status = 0
+    for key, r in results.items():
+        if r.get('tkinter'): print(f'BŁĄD: {key} wczytuje tkinter', file=sys.stderr); status = 1
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f: baseline = json.load(f)['results']
+        print(f'\nporównanie z {args.baseline}:', file=sys.stderr)
+        for key, now, old, change in compare(results, baseline, args.threshold):
+            if change is None: print(f'  {key:32} {now:12.0f}   (brak w baseline)', file=sys.stderr); continue
+            mark = '  REGRESJA' if change < -args.threshold else ''
+            if mark: status = 1
+            print(f'  {key:32} {old:12.0f} -> {now:12.0f} {change:+7.1%}{mark}', file=sys.stderr)
+    if args.save_baseline:
+        save_baseline(results, args.save_baseline)
+        print(f'zapisano baseline: {args.save_baseline}', file=sys.stderr)
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
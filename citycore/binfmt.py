@@ -0,0 +1,208 @@
+"""Binarny format zapisu miasta (.city).
+
+Układ pliku (wersja schematu 4):
+
+    magic    4 bajty  b'CITY'
+    version  1 bajt   SCHEMA_VERSION
+    flags    1 bajt   bit 0 = reszta pliku skompresowana zlib
+    body              ciąg pól poniżej
+
+Liczby całkowite to varinty LEB128 ze znakiem w kodowaniu zigzag (dowolnie duże),
+napisy to varint długości + UTF-8. Kolejność pól w body:
+
+    playername, manager                              napisy
+    day, money, population, happiness, wood, stone,
+    manager_bonus, research_points, prestige_points  varinty
+    budynki      varint N + N varintów w kolejności BUILDING_KEYS
+    produkcja    varint N + N varintów w kolejności PRODUCTION_KEYS; tabela z ułamkami
+                 (GameConfig, --set production.farm=6.5) ma zamiast tego -N i N varintów
+                 z bitami IEEE 754 double każdej wartości (całkowite wracają jako int)
+    upgrades, achievements, quests                   varinty z bitami (indeksy jak w UPGRADE_KEYS
+                                                     i pozycje reguł w rules.json)
+    rng_seed, rng_pos                                varinty (od wersji 2; w wersji 1 brak -
+                                                     gra zachowuje swój obecny generator)
+    saved_at                                         varint, czas zapisu w sekundach unix
+                                                     (od wersji 3; wcześniej 0 = nieznany)
+    rynek        varint 0/1 (od wersji 4); gdy 1: day, trades, volume, varint N
+                 + N cen środkowych * PRICE_SCALE w kolejności RESOURCES
+
+Nowe budynki, ulepszenia i questy dopisuje się tylko na końcu tabel - indeksy bitów
+i kolejność budynków są częścią schematu. Każda zmiana układu body podnosi SCHEMA_VERSION,
+a loads() potrafi czytać wszystkie starsze wersje.
+"""
+import struct
+import sys
+import time
+import zlib
+from array import array
+
+from .fileio import atomic_write
+from .market import Market, RESOURCES
+from .rng import CityRng
+from .state import BUILDING_KEYS
+
+MAGIC = b'CITY'
+SCHEMA_VERSION = 4
+FLAG_ZLIB = 1
+PRODUCTION_KEYS = ("workshop", "farm", "sawmill", "quarry")
+BINARY_EXT = '.city'
+_F64 = struct.Struct('<d')
+_I64 = struct.Struct('<q')
+
+
+def _put_int(out, n):
+    n = (n << 1) if n >= 0 else ((-n << 1) - 1)  # zigzag
+    while n > 0x7f:
+        out.append((n & 0x7f) | 0x80); n >>= 7
+    out.append(n)
+
+
+def _put_str(out, s):
+    b = s.encode('utf-8'); _put_int(out, len(b)); out += b
+
+
+def _get_str(buf, pos):
+    (n,), pos = _get_ints(buf, pos, 1)
+    return bytes(buf[pos:pos + n]).decode('utf-8'), pos + n
+
+
+# dekoduje `count` varintów (albo wszystkie do końca, gdy count=None) w jednej pętli
+def _get_ints(buf, pos, count=None):
+    out = []; append = out.append; n = 0; shift = 0
+    for b in buf[pos:]:
+        pos += 1
+        if b & 0x80:
+            n |= (b & 0x7f) << shift; shift += 7; continue
+        n |= b << shift
+        append((n >> 1) ^ -(n & 1))
+        n = 0; shift = 0
+        if count is not None and len(out) == count: break
+    return out, pos
+
+
+def dumps(game, compress=False):
+    out = bytearray()
+    _put_str(out, game.playername); _put_str(out, game.manager)
+    for v in (game.day, game.money, game.population, game.happiness, game.wood, game.stone,
+              game.manager_bonus, game.research_points, game.prestige_points):
+        _put_int(out, v)
+    _put_int(out, len(game._b))
+    for v in game._b: _put_int(out, v)
+    prod = [game.production[k] for k in PRODUCTION_KEYS]
+    if all(isinstance(x, int) for x in prod):
+        _put_int(out, len(prod))
+        for x in prod: _put_int(out, x)
+    else:
+        _put_int(out, -len(prod))
+        for x in prod: _put_int(out, _I64.unpack(_F64.pack(x))[0])
+    _put_int(out, game._upg); _put_int(out, game._ach); _put_int(out, game._quests)
+    _put_int(out, game.rng.seed); _put_int(out, game.rng.pos)
+    _put_int(out, game.saved_at)
+    m = game._market
+    if m is None: _put_int(out, 0)
+    else:
+        st = m.state()
+        for v in (1, st['day'], st['trades'], st['volume'], len(RESOURCES)): _put_int(out, v)
+        for r in RESOURCES: _put_int(out, st['mid'][r])
+    if compress: return MAGIC + bytes((SCHEMA_VERSION, FLAG_ZLIB)) + zlib.compress(bytes(out), 9)
+    return MAGIC + bytes((SCHEMA_VERSION, 0)) + bytes(out)
+
+
+def loads(data, game):
+    """Wczytuje binarny zapis do istniejącego obiektu gry (szybka ścieżka - bez from_dict)."""
+    if data[:4] != MAGIC: raise ValueError('To nie jest binarny zapis miasta.')
+    version, flags = data[4], data[5]
+    if version > SCHEMA_VERSION: raise ValueError(f'Zapis w nowszej wersji schematu ({version}).')
+    body = zlib.decompress(data[6:]) if flags & FLAG_ZLIB else memoryview(data)[6:]
+    game.playername, pos = _get_str(body, 0)
+    game.manager, pos = _get_str(body, pos)
+    v, _ = _get_ints(body, pos)
+    (game.day, game.money, game.population, game.happiness, game.wood, game.stone,
+     game.manager_bonus, game.research_points, game.prestige_points) = v[:9]
+    i = 10 + v[9]
+    b = v[10:i] + [0] * (len(BUILDING_KEYS) - v[9])
+    game._b = array('q', b[:len(BUILDING_KEYS)]); game._b_shared = False
+    n = v[i]
+    if n >= 0: prod = v[i + 1:i + 1 + n]
+    else:
+        prod = [_F64.unpack(_I64.pack(x))[0] for x in v[i + 1:i + 1 - n]]
+        prod = [int(x) if x.is_integer() else x for x in prod]
+    i += 1 + abs(n)
+    # tabela produkcji zwykle równa domyślnej z configu - wtedy zostaje współdzielona
+    if prod != [game.production[k] for k in PRODUCTION_KEYS]:
+        game.production = dict(zip(PRODUCTION_KEYS, prod))
+    game._upg, game._ach, game._quests = v[i:i + 3]
+    if version >= 2: game.rng = CityRng(v[i + 3], v[i + 4])
+    game.saved_at = v[i + 5] if version >= 3 else 0
+    game._market = None
+    if version >= 4 and v[i + 6]:
+        day, trades, volume, n = v[i + 7:i + 11]
+        game._market = Market.from_state(game.config, {'day': day, 'trades': trades, 'volume': volume,
+                                                       'mid': dict(zip(RESOURCES, v[i + 11:i + 11 + n]))})
+    # bez normalize(): stan ma być odtworzony dokładnie (szczęście po wydarzeniu bywa poza 0..100)
+    game.invalidate()
+    return game
+
+
+def is_binary(filename):
+    with open(filename, 'rb') as f: return f.read(4) == MAGIC
+
+
+def save_binary(game, filename, compress=False):
+    atomic_write(filename, dumps(game, compress))
+
+
+def convert(src, dst, compress=False):
+    """Migracja: JSON, stary city_save.txt albo .city -> binarny (lub JSON, jeśli dst nie kończy się na .city)."""
+    from .game import CityGame
+    game = CityGame()
+    with open(src, 'rb') as f: head = f.read(4)
+    if head == MAGIC or head.lstrip()[:1] == b'{': ok, msg = game.load(src)
+    else: ok, msg = game.import_legacy_txt(src)
+    if not ok: return False, msg
+    if dst.endswith(BINARY_EXT):
+        save_binary(game, dst, compress)
+        return True, f'Zapisano do {dst}'
+    return game.save(dst)
+
+
+def bench(game=None, rounds=2000):
+    """Porównanie rozmiaru i czasu zapisu/odczytu JSON vs binarny."""
+    import json
+    from .game import CityGame
+    if game is None:
+        from .sim import simulate
+        game = CityGame()
+        for k, n in zip(BUILDING_KEYS, (300, 20, 450, 80, 900, 120, 60, 15, 10)): game.buildings[k] = n
+        simulate(3000, seed=1, game=game)
+    rows = []
+    js = lambda: json.dumps(game.to_dict(), ensure_ascii=False, indent=2).encode('utf-8')
+    for name, enc, dec in (
+        ('json', js, lambda d: CityGame().from_dict(json.loads(d))),
+        ('bin', lambda: dumps(game, False), lambda d: loads(d, CityGame())),
+        ('bin+zlib', lambda: dumps(game, True), lambda d: loads(d, CityGame())),
+    ):
+        data = enc()
+        t = time.perf_counter()
+        for _ in range(rounds): enc()
+        t_save = (time.perf_counter() - t) / rounds
+        t = time.perf_counter()
+        for _ in range(rounds): dec(data)
+        t_load = (time.perf_counter() - t) / rounds
+        rows.append((name, len(data), t_save * 1e6, t_load * 1e6))
+    return rows
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['convert'] and len(argv) in (3, 4):
+        ok, msg = convert(argv[1], argv[2], compress='--zlib' in argv)
+        print(msg, file=sys.stdout if ok else sys.stderr)
+        return 0 if ok else 1
+    if argv[:1] == ['savebench']:
+        print(f'{"format":10} {"bajty":>8} {"zapis us":>10} {"odczyt us":>10}')
+        for name, size, ts, tl in bench():
+            print(f'{name:10} {size:8d} {ts:10.1f} {tl:10.1f}')
+        return 0
+    print('użycie: python -m citycore convert ŹRÓDŁO CEL [--zlib] | savebench', file=sys.stderr)
+    return 2
@@ -0,0 +1,140 @@
+# szybkie przewijanie bezczynnych okresów: część deterministyczna w zamkniętej postaci,
+# losowe wydarzenia próbkowane zbiorczo (rozkład dwumianowy) zamiast dzień po dniu
+import math
+import time
+
+from .rng import CityRng
+from .sim import simulate, EVENT_KEYS
+
+# szanse wydarzeń na 100 - muszą zgadzać się z CityGame.roll_event
+EVENT_CHANCES = (('fire', 6), ('good_year', 8), ('migration', 8), ('scandal', 4))
+# poniżej tylu dni po prostu liczymy dzień po dniu (dokładnie)
+EXACT_DAYS = 256
+
+
+def _binomial(rng, n, p):
+    if n <= 0 or p <= 0: return 0
+    if p >= 1: return n
+    if n < 64: return sum(1 for _ in range(n) if rng.random() < p)
+    # przybliżenie normalne - przy dużym n wystarczająco dobre i O(1)
+    x = round(rng.gauss(n * p, math.sqrt(n * p * (1 - p))))
+    return max(0, min(n, x))
+
+
+def sample_events(rng, days):
+    """Zwraca liczbę wystąpień każdego wydarzenia w `days` dniach (rozkład wielomianowy)."""
+    counts = dict.fromkeys(EVENT_KEYS, 0)
+    left = days; rest = 100
+    for key, chance in EVENT_CHANCES:
+        k = _binomial(rng, left, chance / rest)
+        counts[key] = k; left -= k; rest -= chance
+    counts['calm'] = left
+    return counts
+
+
+# szczęście to mały łańcuch Markowa (-10..103), więc jego rozkład liczymy dokładnie
+# przez kilkaset dni aż się ustabilizuje, a resztę okresu traktujemy jako stan stały
+H_MIN, H_MAX = -10, 103
+HAPPY_DAYS_MAX = 512
+
+
+def happiness_path(h0, gain, p_fire, p_migration, p_scandal, days):
+    """Zwraca (oczekiwane szczęście na początku każdego z pierwszych T dni, rozkład po T dniach)."""
+    size = H_MAX - H_MIN + 1
+    outcomes = ((-6, p_fire), (3, p_migration), (-10, p_scandal), (0, 1.0 - p_fire - p_migration - p_scandal))
+    dist = [0.0] * size
+    dist[max(H_MIN, min(H_MAX, h0)) - H_MIN] = 1.0
+    means = []
+    for _ in range(min(days, HAPPY_DAYS_MAX)):
+        means.append(sum(p * (i + H_MIN) for i, p in enumerate(dist) if p))
+        # produkcja: +gain i normalize (0..100), potem wydarzenie bez przycinania
+        clamped = [0.0] * 101
+        for i, p in enumerate(dist):
+            if p: clamped[max(0, min(100, i + H_MIN + gain))] += p
+        new = [0.0] * size
+        for c, p in enumerate(clamped):
+            if not p: continue
+            for delta, q in outcomes:
+                if q: new[c + delta - H_MIN] += p * q
+        done = sum(abs(x - y) for x, y in zip(new, dist)) < 1e-12
+        dist = new
+        if done: break
+    return means, dist
+
+
+def offline_progress(game, now=None, cap_days=None):
+    """Nadrabia auto-dni, które minęły od zapisu (game.saved_at) do `now`.
+
+    Liczba dni = czas / config.offline_day_s, obcięta do cap_days (domyślnie config.offline_cap_days).
+    Zwraca podsumowanie fast_forward() z polami 'missed_days', 'capped' i 'offline_s'
+    albo None, gdy zapis nie ma czasu albo nie minął ani jeden dzień.
+    """
+    if not game.saved_at: return None
+    cfg = game.config
+    offline_s = max(0.0, (time.time() if now is None else now) - game.saved_at)
+    missed = int(offline_s // cfg.offline_day_s)
+    if missed <= 0: return None
+    cap = cfg.offline_cap_days if cap_days is None else cap_days
+    result = fast_forward(game, min(missed, cap))
+    game.saved_at += int(missed * cfg.offline_day_s)  # drugi raz tych samych dni nie nadrobimy
+    result.update(missed_days=missed, capped=missed > cap, offline_s=offline_s)
+    return result
+
+
+def fast_forward(game, days, seed=None, rng=None):
+    """Przewija grę o `days` dni w O(1). Budynki się nie zmieniają, wydarzenia są próbkowane.
+
+    Dla krótkich okresów (< EXACT_DAYS) liczy dokładnie przez end_day.
+    Zwraca podsumowanie w tym samym formacie co simulate().
+    """
+    if days < EXACT_DAYS:
+        result = simulate(days, seed=seed, game=game)
+        result['mode'] = 'exact'
+        return result
+    if seed is not None: game.rng = CityRng(seed)
+    if rng is None: rng = game.rng.stream('fast_forward')
+    t0 = time.perf_counter()
+    start_day = game.day
+    n = days
+    ev = sample_events(rng, n)
+    f, g, m, s = ev['fire'], ev['good_year'], ev['migration'], ev['scandal']
+
+    b_money, day_wood, day_stone, day_research, happy_gain, prestige_mult = game.daily_yields()
+
+    # populacja rośnie liniowo (migracje rozłożone równo), szczęście wg rozkładu łańcucha
+    p0 = game.population; r = 5 * m / n
+    means, dist = happiness_path(game.happiness, happy_gain, f / n, m / n, s / n, n)
+    pop_happy = sum((p0 + r * t) * h for t, h in enumerate(means))
+    t = len(means)
+    if t < n:
+        h_inf = sum(p * (i + H_MIN) for i, p in enumerate(dist))
+        pop_happy += h_inf * (p0 * (n - t) + r * ((t + n - 1) * (n - t) / 2))
+    base_income = pop_happy / 30
+    total_money = int((b_money * n + base_income * (1 + game.manager_bonus / 100)) * prestige_mult)
+    total_wood = day_wood * n
+    total_stone = day_stone * n
+
+    game.money += total_money + 50 * g
+    game.wood += total_wood + 15 * g
+    game.stone += total_stone
+    game.wood -= min(20 * f, game.wood)
+    game.money -= min(100 * s, game.money)
+    game.population += 5 * m
+    game.happiness = rng.choices(range(H_MIN, H_MAX + 1), weights=dist)[0]
+    game.research_points += day_research * n
+    game.day += n
+    game.rng.skip(n)  # te dni "zużyły" swoje rzuty - dalszy przebieg nie zależy od trybu
+    game.normalize()
+    game.check_achievements(); game.check_quests()
+    elapsed = time.perf_counter() - t0
+    return {
+        'days': days,
+        'start_day': start_day,
+        'end_day': game.day,
+        'produced': {'money': total_money, 'wood': total_wood, 'stone': total_stone},
+        'events': ev,
+        'final': game.to_dict(),
+        'elapsed': elapsed,
+        'days_per_sec': days / elapsed if elapsed > 0 else 0.0,
+        'mode': 'analytic',
+    }
@@ -0,0 +1,25 @@
+# zapis plików "wszystko albo nic": plik tymczasowy + fsync + os.replace
+import os
+
+
+def atomic_write(filename, data):
+    """Zapisuje `data` (str lub bytes) tak, że po awarii zostaje stary albo nowy plik, nigdy ucięty."""
+    import tempfile  # tylko przy zapisie - import tempfile (shutil, random) jest drogi dla samego importu rdzenia
+    if isinstance(data, str): data = data.encode('utf-8')
+    folder = os.path.dirname(os.path.abspath(filename))
+    fd, tmp = tempfile.mkstemp(prefix='.' + os.path.basename(filename) + '.', suffix='.tmp', dir=folder)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, filename)
+    except BaseException:
+        try: os.remove(tmp)
+        except OSError: pass
+        raise
+    # utrwal też wpis w katalogu (na Windows nie da się otworzyć katalogu - pomijamy)
+    if hasattr(os, 'O_DIRECTORY'):
+        dfd = os.open(folder, os.O_RDONLY | os.O_DIRECTORY)
+        try: os.fsync(dfd)
+        finally: os.close(dfd)
@@ -0,0 +1,685 @@
+# import rdzenia ma być tani (python -m citycore bench --startup): json i domyślne reguły
+# wczytujemy dopiero przy pierwszym użyciu, GameConfig to zwykła klasa zamiast dataclass
+import os
+import math
+import time
+from array import array
+from types import MappingProxyType
+
+from . import binfmt
+from .fileio import atomic_write
+from .market import Market, RESOURCES
+from .rng import CityRng
+from .rules import default_rules
+from .state import BUILDING_KEYS, BUILDING_INDEX, UPGRADE_KEYS, BuildingsView, FlagMap, FlagSet
+
+SAVE_SLOTS = ["city_save_slot1.json", "city_save_slot2.json", "city_save_slot3.json"]
+LEGACY_TXT = "city_save.txt"
+MARKET_BASE = {"wood": 10, "stone": 12}
+BUY_SPREAD = 1.25
+SELL_SPREAD = 0.9
+
+PRESTIGE_MONEY_REQ = 10_000_000
+PRESTIGE_POP_REQ = 1000
+PRODUCTION = {"workshop": 10, "farm": 8, "sawmill": 6, "quarry": 4}
+OFFLINE_DAY_S = 2.0         # postęp offline: jeden dzień na tyle sekund (jak auto-dzień 1x)
+OFFLINE_CAP_DAYS = 100_000
+# koszty budowy (przed zniżką z ulepszenia reduced_build_costs) i ulepszeń w punktach badań
+BUILD_COSTS = {
+    'house': {'money': 200, 'wood': 20, 'stone': 5}, 'pavilion': {'money': 150, 'wood': 10},
+    'workshop': {'money': 300, 'wood': 30, 'stone': 10}, 'market': {'money': 250, 'wood': 15, 'stone': 10},
+    'farm': {'money': 180, 'wood': 5}, 'sawmill': {'money': 250}, 'quarry': {'money': 250},
+    'school': {'money': 400, 'wood': 20}, 'hospital': {'money': 600, 'wood': 30, 'stone': 20},
+}
+BUILD_DISCOUNT = 0.95
+UPGRADE_COSTS = {'better_tools': 10, 'market_reforms': 6, 'reduced_build_costs': 8, 'manager_prod': 12}
+# menadżerowie: (opis, premia %, koszt zatrudnienia, rola)
+MANAGERS = (
+    ('Jacek (5% baza dochodów)', 5, 1000, 'base_income'),
+    ('Monika (10% baza dochodów)', 10, 2500, 'base_income'),
+    ('Joanna (redukcja kosztów budowy 5%)', 3, 1500, 'reduce_costs'),
+    ('Mariusz (15% produkcji budynków)', 15, 5000, 'prod_boost'),
+)
+MANAGER_INDEX = {m[0].split(' ')[0].lower(): i for i, m in enumerate(MANAGERS)}
+FESTIVAL_COST = 200
+FESTIVAL_HAPPINESS = 20
+# górna granica ilości z akcji gracza: liczniki budynków to array('q'), a eksport i zapisy trzymają int64
+INT64_MAX = 2 ** 63 - 1
+
+
+# parametry balansu - domyślnie stałe modułu, ale każda gra może mieć własne (np. w sweepach)
+class GameConfig:
+    FIELDS = ('market_base', 'buy_spread', 'sell_spread', 'prestige_money_req', 'prestige_pop_req',
+              'production', 'offline_day_s', 'offline_cap_days', 'rules')
+
+    def __init__(self, market_base=None, buy_spread=BUY_SPREAD, sell_spread=SELL_SPREAD,
+                 prestige_money_req=PRESTIGE_MONEY_REQ, prestige_pop_req=PRESTIGE_POP_REQ, production=None,
+                 offline_day_s=OFFLINE_DAY_S, offline_cap_days=OFFLINE_CAP_DAYS, rules=None):
+        self.market_base = dict(MARKET_BASE) if market_base is None else market_base
+        self.buy_spread = buy_spread
+        self.sell_spread = sell_spread
+        self.prestige_money_req = prestige_money_req
+        self.prestige_pop_req = prestige_pop_req
+        self.production = dict(PRODUCTION) if production is None else production
+        self.offline_day_s = offline_day_s
+        self.offline_cap_days = offline_cap_days
+        self._rules = rules
+
+    # rules=None = domyślny katalog citycore/rules.json (citycore.rules.default_rules)
+    @property
+    def rules(self):
+        r = self._rules
+        return r if r is not None else default_rules()
+
+    @rules.setter
+    def rules(self, value): self._rules = value
+
+    def __repr__(self):
+        return 'GameConfig(' + ', '.join(f'{k}={getattr(self, k)!r}' for k in self.FIELDS) + ')'
+
+    def __eq__(self, other):
+        if not isinstance(other, GameConfig): return NotImplemented
+        return all(getattr(self, k) == getattr(other, k) for k in self.FIELDS)
+
+    __hash__ = None
+
+
+DEFAULT_CONFIG = GameConfig()
+
+# domyślny katalog questów i osiągnięć jako stałe modułu - liczone przy pierwszym odwołaniu
+_RULE_CONSTANTS = {
+    'QUEST_DEFS': lambda r: tuple((q['id'], q['desc'], q['reward']) for q in r.quests.rules),
+    'QUEST_KEYS': lambda r: r.quests.keys, 'QUEST_INDEX': lambda r: r.quests.index,
+    'ACHIEVEMENT_KEYS': lambda r: r.achievements.keys, 'ACHIEVEMENT_INDEX': lambda r: r.achievements.index,
+}
+
+
+def __getattr__(name):
+    f = _RULE_CONSTANTS.get(name)
+    if f is None: raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    return f(default_rules())
+
+
+UPGRADE_INDEX = {k: i for i, k in enumerate(UPGRADE_KEYS)}
+_UPG_BETTER_TOOLS = 1 << UPGRADE_INDEX['better_tools']
+_UPG_MANAGER_PROD = 1 << UPGRADE_INDEX['manager_prod']
+_SCHOOL, _PAVILION, _HOSPITAL = (BUILDING_INDEX[k] for k in ('school', 'pavilion', 'hospital'))
+
+
+# klucz wydarzenia dla rzutu 0..99 - te same progi co w CityGame.roll_event
+def event_key(r):
+    if r < 6: return 'fire'
+    if r < 14: return 'good_year'
+    if r < 22: return 'migration'
+    if r < 26: return 'scandal'
+    return 'calm'
+
+
+# (nazwa, bool) -> bity wg indeksu; nieznane nazwy pomijane
+def _bits(index, pairs, bits):
+    for k, v in pairs:
+        i = index.get(k)
+        if i is None: continue
+        bits = bits | (1 << i) if v else bits & ~(1 << i)
+    return bits
+
+
+class CityGame:
+    # __slots__ i bity zamiast słowników: mało pamięci na miasto i tanie fork()
+    __slots__ = ('config', 'playername', 'day', 'money', 'population', 'happiness', 'wood', 'stone',
+                 'manager', 'manager_bonus', '_b', '_b_shared', '_production', 'research_points',
+                 '_upg', '_ach', '_quests', '_prestige', 'rng', 'last_event', 'last_roll', '_yields',
+                 'saved_at', 'stats', 'telemetry', '_awatch', '_qwatch', '_market')
+
+    def __init__(self, config=None, seed=None):
+        self.config = config if config is not None else DEFAULT_CONFIG
+        # podstawowe
+        self.playername = "MojeMiasto"
+        self.day = 1
+        self.money = 500
+        self.population = 10
+        self.happiness = 50
+        self.wood = 50
+        self.stone = 20
+        # menadzer
+        self.manager = "Brak"
+        self.manager_bonus = 0
+        # budynki (indeks wg BUILDING_KEYS); tablica może być współdzielona z forkiem
+        self._b = array('q', bytes(8 * len(BUILDING_KEYS)))
+        self._b_shared = False
+        # tabela produkcji współdzielona z configiem - na zewnątrz tylko do odczytu (patrz production)
+        self._production = self.config.production
+        # badania i ulepszenia
+        self.research_points = 0
+        self._upg = 0
+        self._ach = 0
+        # quests
+        self._quests = 0
+        # stan indeksu reguł (kursory, progi) - None = do przeliczenia z bitów
+        self._awatch = self._qwatch = None
+        # prestige
+        self._prestige = 0
+        # własny generator losowości (ziarno + pozycja, zapisywany razem ze stanem)
+        self.rng = CityRng(seed)
+        # internal flags
+        self.last_event = 'calm'
+        self.last_roll = -1
+        self._yields = None
+        # czas ostatniego zapisu (unix, sekundy); 0 = nieznany
+        self.saved_at = 0
+        # rynek surowców (citycore.market) - tworzony przy pierwszym użyciu
+        self._market = None
+        # pomiary (citycore.instrument.Stats) - None = wyłączone
+        self.stats = None
+        # eksport dni (citycore.telemetry.Telemetry) - None = wyłączony
+        self.telemetry = None
+        self.normalize()
+
+    @property
+    def buildings(self): return BuildingsView(self)
+
+    @buildings.setter
+    def buildings(self, value):
+        self._b = array('q', bytes(8 * len(BUILDING_KEYS))); self._b_shared = False
+        for k, v in value.items(): self.set_building(k, v)
+
+    # obie wartości wchodzą do cache dziennych plonów (_yields), więc zmiana go czyści;
+    # tabela produkcji bywa współdzielona (config, inne miasta) - zmienia się ją tylko w całości
+    @property
+    def production(self): return MappingProxyType(self._production)
+
+    @production.setter
+    def production(self, table):
+        self._production = dict(table); self.invalidate()
+
+    @property
+    def prestige_points(self): return self._prestige
+
+    @prestige_points.setter
+    def prestige_points(self, value):
+        self._prestige = value; self.invalidate()
+
+    @property
+    def upgrades(self): return FlagMap(self, '_upg', UPGRADE_KEYS, UPGRADE_INDEX)
+
+    @property
+    def achievements(self):
+        t = self.config.rules.achievements
+        return FlagSet(self, '_ach', t.keys, t.index)
+
+    @achievements.setter
+    def achievements(self, value):
+        self._ach = 0
+        for name in value: self.achievements.add(name)
+
+    @property
+    def quests(self):
+        # widok w dawnym formacie {qid: {desc, done, reward}} - tylko do odczytu
+        return {r['id']: {"desc": r['desc'], "done": bool(self._quests >> i & 1), "reward": r['reward']}
+                for i, r in enumerate(self.config.rules.quests.rules)}
+
+    def init_default_quests(self):
+        self._quests = 0; self._qwatch = None
+
+    def quest_done(self, qid):
+        return bool(self._quests >> self.config.rules.quests.index[qid] & 1)
+
+    def set_quest_done(self, qid, done=True):
+        self.set_flag('_quests', self.config.rules.quests.index[qid], done)
+
+    def set_flag(self, attr, index, value):
+        bits = getattr(self, attr)
+        setattr(self, attr, bits | (1 << index) if value else bits & ~(1 << index))
+        if attr == '_upg': self._yields = None
+        elif attr == '_quests': self._qwatch = None
+        elif attr == '_ach': self._awatch = None
+
+    def set_building(self, kind, n):
+        i = BUILDING_INDEX[kind]
+        if self._b_shared: self._b = array('q', self._b); self._b_shared = False
+        self._b[i] = n
+        self._yields = None
+
+    def fork(self):
+        """Tania kopia miasta (copy-on-write): tablica budynków jest współdzielona do pierwszego zapisu."""
+        clone = CityGame.__new__(CityGame)
+        for name in CityGame.__slots__: setattr(clone, name, getattr(self, name))
+        self._b_shared = clone._b_shared = True
+        clone.rng = self.rng.copy()
+        if self._market is not None: clone._market = self._market.copy()
+        # dni liczone na forku (planer, auto-dzień) nie trafiają do eksportu gry
+        clone.telemetry = None
+        return clone
+
+    def to_dict(self):
+        return {
+            "playername": self.playername,
+            "day": self.day,
+            "money": self.money,
+            "population": self.population,
+            "happiness": self.happiness,
+            "wood": self.wood,
+            "stone": self.stone,
+            "manager": self.manager,
+            "manager_bonus": self.manager_bonus,
+            "buildings": dict(zip(BUILDING_KEYS, self._b)),
+            "production": dict(self.production),
+            "research_points": self.research_points,
+            "upgrades": dict(self.upgrades),
+            "achievements": sorted(self.achievements),
+            "quests": self.quests,
+            "prestige_points": self.prestige_points,
+            "rng": self.rng.state(),
+            "saved_at": self.saved_at,
+            **({"market": self._market.state()} if self._market is not None else {}),
+        }
+
+    def from_dict(self, data: dict):
+        self.playername = data.get("playername", self.playername)
+        self.day = int(data.get("day", self.day))
+        self.money = int(data.get("money", self.money))
+        self.population = int(data.get("population", self.population))
+        self.happiness = int(data.get("happiness", self.happiness))
+        self.wood = int(data.get("wood", self.wood))
+        self.stone = int(data.get("stone", self.stone))
+        self.manager = data.get("manager", self.manager)
+        self.manager_bonus = int(data.get("manager_bonus", self.manager_bonus)) if 'manager_bonus' in data else 0
+        b = array('q', self._b)
+        for k, v in data.get("buildings", {}).items():
+            if k in BUILDING_INDEX: b[BUILDING_INDEX[k]] = int(v)
+        self._b = b; self._b_shared = False
+        if data.get("production"):
+            self.production = {**self.production, **data["production"]}
+        self.research_points = int(data.get("research_points", self.research_points))
+        self._upg = _bits(UPGRADE_INDEX, data.get("upgrades", {}).items(), self._upg)
+        rules = self.config.rules
+        self._ach = _bits(rules.achievements.index, ((k, True) for k in data.get("achievements", [])), 0)
+        self._quests = _bits(rules.quests.index, ((k, q.get('done')) for k, q in data.get('quests', {}).items()), self._quests)
+        self.prestige_points = int(data.get('prestige_points', self.prestige_points))
+        if 'rng' in data: self.rng = CityRng.from_state(data['rng'])
+        self.saved_at = int(data.get('saved_at', 0))
+        self._market = Market.from_state(self.config, data['market']) if data.get('market') else None
+        self.invalidate()
+        self.normalize()
+
+    def normalize(self):
+        self.wood = max(0, int(self.wood))
+        self.stone = max(0, int(self.stone))
+        self.happiness = max(0, min(100, int(self.happiness)))
+        self.population = max(0, int(self.population))
+        self.money = max(0, int(self.money))
+
+    # format zależy od rozszerzenia: .city = binarny (binfmt), reszta = JSON
+    def save(self, filename):
+        try:
+            t0 = time.perf_counter_ns()
+            self.saved_at = int(time.time())
+            if filename.endswith(binfmt.BINARY_EXT):
+                binfmt.save_binary(self, filename)
+            else:
+                import json
+                atomic_write(filename, json.dumps(self.to_dict(), ensure_ascii=False, indent=2))
+            if self.stats is not None: self.stats.add('save', time.perf_counter_ns() - t0)
+            return True, f'Zapisano do {filename}'
+        except Exception as e:
+            return False, str(e)
+
+    # format rozpoznawany po zawartości: binarny, JSON albo stary city_save.txt
+    def load(self, filename):
+        try:
+            if not os.path.exists(filename):
+                return False, 'Plik zapisu nie istnieje.'
+            with open(filename, 'rb') as f:
+                data = f.read()
+            if data[:4] == binfmt.MAGIC:
+                binfmt.loads(data, self)
+            elif data.lstrip()[:1] == b'{':
+                import json
+                self.from_dict(json.loads(data.decode('utf-8')))
+            else:
+                return self.import_legacy_txt(filename)
+            return True, 'Wczytano zapis.'
+        except Exception as e:
+            return False, str(e)
+
+    def import_legacy_txt(self, filename=LEGACY_TXT):
+        try:
+            if not os.path.exists(filename):
+                return False, 'Brak legacy pliku.'
+            with open(filename, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if '=' not in line: continue
+                    key, val = line.split('=', 1); key=key.strip(); val=val.strip()
+                    if key == 'playername': self.playername = val
+                    elif key == 'day': self.day = int(val)
+                    elif key == 'money': self.money = int(val)
+                    elif key == 'population': self.population = int(val)
+                    elif key == 'happiness': self.happiness = int(val)
+                    elif key == 'wood': self.wood = int(val)
+                    elif key == 'stone': self.stone = int(val)
+                    elif key == 'manager': self.manager = val
+                    elif key == 'workshop': self.buildings['workshop'] = int(val)
+            self.invalidate()
+            self.normalize()
+            return True, 'Zaimportowano legacy zapis.'
+        except Exception as e:
+            return False, str(e)
+
+    # oblicz efektywną liczbę budynków (diminishing returns)
+    def effective_count(self, cnt):
+        if cnt <= 0: return 0
+        return int(max(1, math.pow(cnt, 0.85)))
+
+    # dzienna produkcja samych budynków (przed mnożnikiem prestiżu): money, wood, stone
+    def building_yields(self):
+        total_money = 0
+        total_wood = 0
+        total_stone = 0
+        upg = self._upg
+        # lepsze narzędzia
+        tool_mult = 1.2 if upg & _UPG_BETTER_TOOLS else 1.0
+        # manager production bonus (ograniczony)
+        mgr_prod_bonus = 0.15 if upg & _UPG_MANAGER_PROD else 0.0
+        mgr_prod_bonus = min(mgr_prod_bonus, 0.5)
+        for b, cnt in zip(BUILDING_KEYS, self._b):
+            if cnt <= 0: continue
+            eff = self.effective_count(cnt)
+            if b == 'workshop':
+                base = int(self._production['workshop'] * eff)
+                total_money += int(base * tool_mult * (1 + mgr_prod_bonus))
+            elif b == 'farm':
+                base = int(self._production['farm'] * eff)
+                total_money += int(base * tool_mult * (1 + mgr_prod_bonus))
+            elif b == 'sawmill':
+                base = int(self._production['sawmill'] * eff)
+                total_wood += int(base * tool_mult)
+            elif b == 'quarry':
+                base = int(self._production['quarry'] * eff)
+                total_stone += int(base * tool_mult)
+            elif b == 'market':
+                total_money += int(2 * eff)
+        return total_money, total_wood, total_stone
+
+    # wszystko co w produkcji dnia zależy tylko od budynków, ulepszeń i prestiżu - liczone raz
+    # i trzymane do czasu invalidate() (budowa, ulepszenie, menadżer, prestiż, wczytanie)
+    def daily_yields(self):
+        y = self._yields
+        if y is None:
+            total_money, total_wood, total_stone = self.building_yields()
+            prestige_mult = 1.0 + (self.prestige_points * 0.02)
+            b = self._b
+            school = b[_SCHOOL]
+            happy = b[_PAVILION] + b[_HOSPITAL] + school
+            y = self._yields = (total_money, int(total_wood * prestige_mult), int(total_stone * prestige_mult),
+                                int(school * 0.5 * prestige_mult), happy, prestige_mult)
+        return y
+
+    def invalidate(self):
+        self._yields = None
+        self._awatch = self._qwatch = None
+
+    def add_building(self, kind, n=1):
+        self.set_building(kind, self._b[BUILDING_INDEX[kind]] + n)
+
+    def set_upgrade(self, name, value=True):
+        self.set_flag('_upg', UPGRADE_INDEX[name], value)
+
+    # koszt jednego budynku po zniżce: (money, wood, stone)
+    def build_cost(self, kind):
+        cost = BUILD_COSTS[kind]
+        discount = BUILD_DISCOUNT if self._upg >> UPGRADE_INDEX['reduced_build_costs'] & 1 else 1.0
+        return tuple(int(cost.get(r, 0) * discount) for r in ('money', 'wood', 'stone'))
+
+    # ile budynków stać nas zbudować: min(zasób // koszt) - O(1) niezależnie od liczby
+    def affordable(self, kind):
+        n = None
+        for have, c in zip((self.money, self.wood, self.stone), self.build_cost(kind)):
+            if c: n = have // c if n is None else min(n, have // c)
+        return n or 0
+
+    # n budynków naraz (jedna kontrola zasobów, koszt n * koszt jednego); n='max' = ile się da
+    def build(self, kind, n=1):
+        if kind not in BUILD_COSTS: return False, 'Nieprawidłowy budynek.'
+        room = INT64_MAX - self._b[BUILDING_INDEX[kind]]
+        if n == 'max': n = min(self.affordable(kind), room)
+        elif n <= 0: return False, 'Nieprawidłowa liczba budynków.'
+        elif n > room: return False, 'Za dużo budynków tego rodzaju.'
+        m, w, s = self.build_cost(kind)
+        if n <= 0 or self.money < m * n or self.wood < w * n or self.stone < s * n: return False, 'Nie masz wystarczająco zasobów.'
+        self.money -= m * n; self.wood -= w * n; self.stone -= s * n
+        self.add_building(kind, n)
+        if n > 1: return True, f'Wybudowano {n}x {kind} za {m * n}$, {w * n} drewna, {s * n} kamienia. Ilość: {self._b[BUILDING_INDEX[kind]]}'
+        return True, f'Wybudowano {kind}. Ilość: {self._b[BUILDING_INDEX[kind]]}'
+
+    def buy_upgrade(self, name):
+        cost = UPGRADE_COSTS[name]
+        if self._upg >> UPGRADE_INDEX[name] & 1: return False, 'To ulepszenie jest już kupione.'
+        if self.research_points < cost: return False, 'Brak punktów badań'
+        self.research_points -= cost; self.set_upgrade(name)
+        return True, f'Kupiono ulepszenie: {name} (koszt {cost})'
+
+    def production_day(self):
+        b_money, total_wood, total_stone, research, happy, prestige_mult = self._yields or self.daily_yields()
+        # podstawowy dochód z populacji
+        base_income = (self.population * self.happiness) // 30
+        total_money = b_money + base_income
+        # menadzer procentowy teraz tylko na base_income (ograniczenie exploitów)
+        if self.manager_bonus:
+            total_money += (base_income * self.manager_bonus) // 100
+        # zastosuj prestiżowy mnożnik dopiero na produkcję (ale nie na koszty/handel)
+        total_money = int(total_money * prestige_mult)
+
+        self.money += total_money
+        self.wood += total_wood
+        self.stone += total_stone
+        # drobne efekty budynków (altany, szpitale, szkoły) i badania ze szkół
+        self.happiness += happy
+        self.research_points += research
+        self.normalize()
+        return {'money': total_money, 'wood': total_wood, 'stone': total_stone}
+
+    # roll z zewnątrz (dziennik, rzuty pobrane blokiem przez rng.take) nie przesuwa self.rng
+    def end_day(self, roll=None):
+        if self.stats is not None: return self._end_day_timed(roll)
+        produced = self.production_day()
+        self.last_roll = r = self.rng.roll() if roll is None else roll
+        self.last_event, event_text = self.roll_event(r)
+        self.day += 1
+        self.check_achievements(); self.check_quests()
+        if self.telemetry is not None: self.telemetry.record(self)
+        return produced, event_text
+
+    # to samo co end_day, ale z pomiarem każdego etapu (gdy włączone self.stats)
+    def _end_day_timed(self, roll):
+        st = self.stats; ns = time.perf_counter_ns
+        t0 = ns()
+        produced = self.production_day()
+        t1 = ns()
+        self.last_roll = r = self.rng.roll() if roll is None else roll
+        self.last_event, event_text = self.roll_event(r)
+        self.day += 1
+        t2 = ns()
+        self.check_achievements()
+        t3 = ns()
+        self.check_quests()
+        t4 = ns()
+        st.add('production_day', t1 - t0); st.add('event_roll', t2 - t1)
+        st.add('achievements', t3 - t2); st.add('quests', t4 - t3); st.add('end_day', t4 - t0)
+        st.count('days'); st.count('event.' + self.last_event)
+        if self.telemetry is not None:
+            self.telemetry.record(self); st.add('telemetry', ns() - t4)
+        return produced, event_text
+
+    # losowe wydarzenie dnia; zwraca (klucz, opis) - klucz przydaje się w symulacji
+    def roll_event(self, r):
+        if r < 6:
+            lost = min(20, self.wood); self.wood -= lost; self.happiness -= 6
+            return 'fire', f'Pożar! Straciłeś {lost} drewna i -6 szczęścia.'
+        elif r < 14:
+            self.money += 50; self.wood += 15; return 'good_year', 'Dobry rok: +50$, +15 drewna.'
+        elif r < 22:
+            self.population += 5; self.happiness += 3; return 'migration', 'Migracja: +5 osób.'
+        elif r < 26:
+            lost_money = min(100, self.money); self.money -= lost_money; self.happiness -= 10
+            return 'scandal', f'Skandal: straciłeś {lost_money}$ i -10 szczęścia.'
+        return 'calm', 'Dzień spokojny.'
+
+    def check_achievements(self):
+        w = self._awatch
+        if w is None: w = self._awatch = self.config.rules.achievements.watch(self._ach)
+        for get, th in w[2]:
+            if get(self) >= th:
+                self._awatch, self._ach = self._check_rules(self.config.rules.achievements, w, self._ach); return
+
+    def check_quests(self):
+        w = self._qwatch
+        if w is None: w = self._qwatch = self.config.rules.quests.watch(self._quests)
+        for get, th in w[2]:
+            if get(self) >= th:
+                self._qwatch, self._quests = self._check_rules(self.config.rules.quests, w, self._quests); return
+
+    # jedno porównanie na obserwowaną statystykę (tylko w check_*); po przekroczeniu progu
+    # przechodzimy przez wszystkie statystyki, a nagroda może przekroczyć kolejny próg, więc
+    # powtarzamy, dopóki jakaś reguła coś dała. Zwraca (nowy stan indeksu, bity).
+    def _check_rules(self, t, watch, done):
+        cur, thr, _ = watch
+        again = True
+        while again:
+            again = False
+            for s, get in enumerate(t.getters):
+                v = get(self)
+                if v < thr[s]: continue
+                c, th, hits = t.advance(s, v, cur[s], done)
+                cur = cur[:s] + (c,) + cur[s + 1:]; thr = thr[:s] + (th,) + thr[s + 1:]
+                for bit in hits:
+                    done |= 1 << bit
+                    if t.rewards[bit]: self.apply_reward(t.rewards[bit]); again = True
+        return t.with_watch(cur, thr), done
+
+    # --- rynek ---
+    @property
+    def market(self):
+        if self._market is None: self._market = Market(self.config, self.day)
+        self._market.sync(self)
+        return self._market
+
+    def quote(self, side, res, qty):
+        return self.market.quote(self, side, res, qty)
+
+    def buy(self, res, qty):
+        if res not in RESOURCES or qty <= 0: return False, 'Nieprawidłowe zlecenie.'
+        if self.money < self.quote('buy', res, qty): return False, 'Nie masz wystarczająco pieniędzy'
+        price = self.market.execute(self, 'buy', res, qty)
+        self.money -= price
+        setattr(self, res, getattr(self, res) + qty)
+        return True, f'Kupiono {qty} {res} za {price}$'
+
+    def sell(self, res, qty):
+        if res not in RESOURCES or qty <= 0: return False, 'Nieprawidłowe zlecenie.'
+        if qty > getattr(self, res): return False, 'Nie masz tyle drewna' if res == 'wood' else 'Nie masz tyle kamienia'
+        price = self.market.execute(self, 'sell', res, qty)
+        setattr(self, res, getattr(self, res) - qty)
+        self.money += price
+        return True, f'Sprzedano {qty} {res} za {price}$'
+
+    # --- akcje gracza (te same co przyciski GUI) ---
+    # i = indeks w MANAGERS albo imię ('jacek')
+    def hire_manager(self, i):
+        if isinstance(i, str): i = MANAGER_INDEX.get(i.lower(), -1)
+        if not 0 <= i < len(MANAGERS): return False, 'Nieznany menadżer.'
+        name, bonus, cost, role = MANAGERS[i]
+        if self.money < cost: return False, 'Nie masz pieniędzy'
+        self.money -= cost
+        self.manager = name.split(' ')[0]; self.manager_bonus = bonus
+        if role == 'reduce_costs': self.set_upgrade('reduced_build_costs'); self.manager_bonus = 0
+        if role == 'prod_boost': self.set_upgrade('manager_prod'); self.manager_bonus = 0
+        return True, f'Zatrudniono {self.manager} (premia {bonus}%). Koszt: {cost}$'
+
+    def collect_taxes(self, tax):
+        if tax < 0: return False, 'Podatek nie może być ujemny.'
+        if tax > INT64_MAX - self.money: return False, 'Za wysoki podatek.'
+        self.money += tax; lost = tax // 5; self.happiness -= lost
+        return True, f'Pobrano {tax}$ podatków (-{lost} szczęścia)'
+
+    def festival(self):
+        if self.money < FESTIVAL_COST: return False, 'Nie masz pieniędzy'
+        self.money -= FESTIVAL_COST; self.happiness += FESTIVAL_HAPPINESS
+        return True, f'Zorganizowano festyn (-{FESTIVAL_COST}$, +{FESTIVAL_HAPPINESS} szczęścia)'
+
+    def perform(self, op, args=None):
+        """Akcja gracza po nazwie (patrz ACTIONS): perform('build', {'kind': 'farm', 'n': 5}) -> (ok, msg)."""
+        fn = ACTIONS.get(op)
+        if fn is None: return False, f'Nieznana operacja: {op}'
+        try: return fn(self, args or {})
+        except (KeyError, TypeError, ValueError, OverflowError) as e: return False, f'Błędne argumenty: {e}'
+
+    def apply_batch(self, actions):
+        """Wykonuje listę akcji [{'op': 'build', 'kind': 'farm', 'n': 'max'}, {'op': 'upgrade', ...}] jako transakcję.
+
+        Akcje idą po kolei na forku; gdy wszystkie się udadzą, fork staje się stanem gry,
+        a gdy któraś nie - gra zostaje nietknięta. Zwraca (ok, komunikaty kolejnych akcji).
+        """
+        work = self.fork(); work.telemetry = self.telemetry; msgs = []
+        for i, act in enumerate(actions):
+            if not isinstance(act, dict): return False, msgs + [f'Akcja {i + 1}: oczekiwano słownika.']
+            args = dict(act); op = args.pop('op', None)
+            ok, msg = work.perform(op, args)
+            if not ok: return False, msgs + [f'Akcja {i + 1} ({op}): {msg}']
+            msgs.append(msg)
+        for name in CityGame.__slots__: setattr(self, name, getattr(work, name))
+        return True, msgs
+
+    def apply_reward(self, reward: dict):
+        if not reward: return
+        self.money += reward.get('money', 0)
+        self.research_points += reward.get('research', 0)
+        self.wood += reward.get('wood', 0)
+        self.stone += reward.get('stone', 0)
+
+    # prestiż: oblicz ile punktów dałby reset teraz
+    def prestige_value_if_reset(self):
+        cfg = self.config
+        pts = (self.money // cfg.prestige_money_req) + (self.population // cfg.prestige_pop_req) + (self.day // 1000)
+        return int(pts)
+
+    def can_prestige(self):
+        return self.prestige_value_if_reset() > 0
+
+    def do_prestige(self):
+        pts = self.prestige_value_if_reset()
+        if pts <= 0: return False, 'Za mało postępu by zdobyć prestiż.'
+        # nadawaj punkty i resetuj większość rzeczy
+        self.prestige_points += pts
+        # rynek dociągamy do starego dnia i przestawiamy jego zegar - inaczej sync() czekałby,
+        # aż miasto znowu dojdzie do dnia sprzed prestiżu
+        if self._market is not None: self._market.sync(self); self._market.day = 1
+        # zachowaj imię, prestiż i ewentualnie pewne kosmetyki — resetujemy rozbudowę
+        self.day = 1
+        self.money = 1000
+        self.population = 10
+        self.happiness = 50
+        self.wood = 20
+        self.stone = 10
+        # reset budynków i ulepszeń (możemy zachować niektóre trwałe ulepszenia w przyszłości)
+        self._b = array('q', bytes(8 * len(BUILDING_KEYS))); self._b_shared = False
+        self.invalidate()
+        # nie usuwamy questów — można ponownie zdobywać nagrody
+        # nagradzamy gracza krótkim komunikatem
+        return True, f'Zdobyto {pts} punktów prestiżu. Teraz masz {self.prestige_points} punktów.'
+
+
+def _build_n(n):
+    return n if n == 'max' else int(n)
+
+
+# akcje gracza po nazwie - wspólne dla wsadowego API (apply_batch), serwera i skryptów
+ACTIONS = {
+    'build': lambda g, a: g.build(a['kind'], _build_n(a.get('n', 1))),
+    'upgrade': lambda g, a: g.buy_upgrade(a['name']),
+    'hire': lambda g, a: g.hire_manager(a['manager']),
+    'taxes': lambda g, a: g.collect_taxes(int(a['amount'])),
+    'festival': lambda g, a: g.festival(),
+    'buy': lambda g, a: g.buy(a['res'], int(a['qty'])),
+    'sell': lambda g, a: g.sell(a['res'], int(a['qty'])),
+    'prestige': lambda g, a: g.do_prestige(),
+}
@@ -0,0 +1,142 @@
+# opcjonalne pomiary gorących ścieżek: game.stats = Stats() włącza liczniki i czasy
+# (production_day, rzut wydarzenia, osiągnięcia/questy, zapis, odświeżanie GUI).
+# Wyłączone (stats = None) kosztują jedno sprawdzenie atrybutu na dzień.
+import cProfile
+import io
+import json
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+
+class Stats:
+    """Liczniki i timery: nazwa -> [wywołania, suma ns, max ns]. Współdzielone przez forki miasta,
+    także te w wątkach (auto-dzień, autozapis) - stąd blokada."""
+
+    def __init__(self):
+        self.timers = {}
+        self.counters = Counter()
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def add(self, name, ns):
+        with self._lock:
+            t = self.timers.get(name)
+            if t is None: self.timers[name] = [1, ns, ns]; return
+            t[0] += 1; t[1] += ns
+            if ns > t[2]: t[2] = ns
+
+    def count(self, name, n=1):
+        with self._lock: self.counters[name] += n
+
+    @contextmanager
+    def timer(self, name):
+        t = time.perf_counter_ns()
+        try: yield
+        finally: self.add(name, time.perf_counter_ns() - t)
+
+    def reset(self):
+        with self._lock: self.timers.clear(); self.counters.clear(); self.started = time.time()
+
+    def snapshot(self):
+        with self._lock:
+            timers = {k: tuple(t) for k, t in self.timers.items()}; counters = dict(self.counters)
+        return {
+            'uptime_s': round(time.time() - self.started, 3),
+            'timers': {k: {'calls': n, 'total_ms': round(tot / 1e6, 3), 'mean_us': round(tot / n / 1e3, 3),
+                           'max_us': round(mx / 1e3, 3)} for k, (n, tot, mx) in sorted(timers.items())},
+            'counters': dict(sorted(counters.items())),
+        }
+
+    def dump(self, out, **extra):
+        """Dopisuje migawkę jako jedną linię JSON (out = ścieżka albo otwarty plik)."""
+        row = {'time': round(time.time(), 3), **extra, **self.snapshot()}
+        line = json.dumps(row, ensure_ascii=False) + '\n'
+        if isinstance(out, str):
+            with open(out, 'a', encoding='utf-8') as f: f.write(line)
+        else:
+            out.write(line)
+
+    def format(self):
+        """Tekst do panelu statystyk."""
+        snap = self.snapshot()
+        lines = [f'{"timer":18} {"wywołań":>9} {"śr. us":>9} {"max us":>9} {"suma ms":>9}']
+        for k, t in snap['timers'].items():
+            lines.append(f'{k:18} {t["calls"]:9d} {t["mean_us"]:9.1f} {t["max_us"]:9.1f} {t["total_ms"]:9.1f}')
+        if snap['counters']:
+            lines.append('')
+            lines += [f'{k:18} {v:9d}' for k, v in snap['counters'].items()]
+        return '\n'.join(lines)
+
+
+class SamplingProfiler:
+    """Próbkuje stos wątku co `interval` s (sys._current_frames) - mały narzut, działa też na GUI."""
+
+    def __init__(self, interval=0.001, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.samples = Counter()   # (plik, linia, funkcja) najgłębszej ramki
+        self.inclusive = Counter() # każda funkcja na stosie
+        self.total = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None: continue
+            self.total += 1
+            code = frame.f_code
+            self.samples[(code.co_filename, frame.f_lineno, code.co_name)] += 1
+            seen = set()
+            while frame is not None:
+                key = (frame.f_code.co_filename, frame.f_code.co_name)
+                if key not in seen: seen.add(key); self.inclusive[key] += 1
+                frame = frame.f_back
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='sampler', daemon=True); self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set(); self._thread.join()
+
+    def report(self, top=25):
+        out = [f'{self.total} próbek co {self.interval * 1000:.1f} ms', '', 'najczęściej na szczycie stosu:']
+        for (fn, line, name), n in self.samples.most_common(top):
+            out.append(f'{n / self.total:7.1%}  {name}  {fn}:{line}')
+        out += ['', 'łącznie (funkcja na stosie):']
+        for (fn, name), n in self.inclusive.most_common(top):
+            out.append(f'{n / self.total:7.1%}  {name}  {fn}')
+        return '\n'.join(out)
+
+
+@contextmanager
+def profiled(kind='cprofile', out=None, top=25):
+    """Opakowuje blok w profiler: kind = 'cprofile' albo 'sample'.
+
+    out = ścieżka: cProfile zapisuje tam surowe dane (.prof, do snakeviz/pstats), sampler - raport tekstowy.
+    Bez out raport trafia na stderr.
+    """
+    if kind == 'cprofile':
+        prof = cProfile.Profile(); prof.enable()
+        try: yield prof
+        finally:
+            prof.disable()
+            if out: prof.dump_stats(out)
+            else:
+                s = io.StringIO(); pstats.Stats(prof, stream=s).sort_stats('cumulative').print_stats(top)
+                print(s.getvalue(), file=sys.stderr)
+    elif kind == 'sample':
+        prof = SamplingProfiler().start()
+        try: yield prof
+        finally:
+            prof.stop()
+            if out:
+                with open(out, 'w', encoding='utf-8') as f: f.write(prof.report(top) + '\n')
+            else: print(prof.report(top), file=sys.stderr)
+    else:
+        raise ValueError(f'Nieznany profiler: {kind}')
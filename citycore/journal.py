@@ -0,0 +1,131 @@
+# dziennik dni: tylko dopisywanie, stały rozmiar rekordu (da się czytać przez mmap)
+# plik .jnl - rekordy 32 B, plik .ckp - sklejone pełne stany w formacie binfmt
+import mmap
+import os
+import struct
+
+from . import binfmt
+from .game import CityGame, event_key
+
+# kind, code (rzut kości albo akcja), zarezerwowane, dzień, a, b, c
+RECORD = struct.Struct('<BBHIqqq')
+REC_DAY = 1         # code = rzut 0..99, a/b/c = produkcja money/wood/stone
+REC_CHECKPOINT = 2  # code = indeks w ACTIONS, a = offset w .ckp, b = długość
+ACTIONS = ('periodic', 'open', 'build', 'manager', 'taxes', 'festival', 'trade', 'upgrade',
+           'prestige', 'load', 'new_game', 'fast_forward')
+CHECKPOINT_EVERY = 1000
+
+
+class Journal:
+    def __init__(self, base, checkpoint_every=CHECKPOINT_EVERY):
+        self.jnl_path = base + '.jnl'
+        self.ckp_path = base + '.ckp'
+        self.checkpoint_every = checkpoint_every
+        self._jnl = open(self.jnl_path, 'ab')
+        self._ckp = open(self.ckp_path, 'ab')
+        self._ckp_size = self._ckp.seek(0, os.SEEK_END)
+        self._since_checkpoint = 0
+
+    def record_day(self, game, produced):
+        """Po CityGame.end_day: zapisuje rzut i produkcję dnia (game.day już jest następnym dniem)."""
+        self.record(game.day - 1, game.last_roll, produced, game)
+
+    def record(self, day, roll, produced, snapshot=None):
+        """Rekord dnia policzonego gdzie indziej (np. w wątku auto-dnia); snapshot = stan po tym dniu,
+        potrzebny tylko wtedy, gdy wypada okresowy checkpoint (patrz days_to_checkpoint)."""
+        self._jnl.write(RECORD.pack(REC_DAY, roll, 0, day, produced['money'], produced['wood'], produced['stone']))
+        self._since_checkpoint += 1
+        if self._since_checkpoint >= self.checkpoint_every and snapshot is not None:
+            self.checkpoint(snapshot)
+
+    def days_to_checkpoint(self):
+        return max(1, self.checkpoint_every - self._since_checkpoint)
+
+    def checkpoint(self, game, action='periodic'):
+        """Pełny stan po akcji gracza (albo okresowo) - od niego zaczyna się odtwarzanie."""
+        data = binfmt.dumps(game)
+        self._ckp.write(data); self._ckp.flush()
+        self._jnl.write(RECORD.pack(REC_CHECKPOINT, ACTIONS.index(action), 0, game.day, self._ckp_size, len(data), 0))
+        self._jnl.flush()
+        self._ckp_size += len(data)
+        self._since_checkpoint = 0
+
+    def flush(self):
+        self._jnl.flush(); self._ckp.flush()
+
+    def close(self):
+        self._jnl.close(); self._ckp.close()
+
+    # --- odczyt ---
+    def _view(self):
+        self.flush()
+        return JournalView(self.jnl_path, self.ckp_path)
+
+    def state_at(self, day, segment=-1):
+        view = self._view()
+        try: return view.state_at(day, segment)
+        finally: view.close()
+
+
+class JournalView:
+    """Odczyt dziennika przez mmap. Segment = okres bez cofnięcia dnia (prestiż, nowa gra, wczytanie)."""
+
+    def __init__(self, jnl_path, ckp_path):
+        self._jf = open(jnl_path, 'rb'); self._cf = open(ckp_path, 'rb')
+        size = os.fstat(self._jf.fileno()).st_size
+        self.count = size // RECORD.size
+        self._jm = mmap.mmap(self._jf.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        csize = os.fstat(self._cf.fileno()).st_size
+        self._cm = mmap.mmap(self._cf.fileno(), 0, access=mmap.ACCESS_READ) if csize else b''
+        # indeks checkpointów: (nr rekordu, dzień, offset, długość, segment)
+        self.checkpoints = []
+        seg = 0; prev_day = None
+        for i, (kind, code, _, d, a, b, c) in enumerate(RECORD.iter_unpack(self._jm[:self.count * RECORD.size])):
+            # cofnięcie albo skok dnia (prestiż, wczytanie, nowa gra) zaczyna nowy segment
+            if prev_day is not None and d != prev_day: seg += 1
+            prev_day = d if kind == REC_CHECKPOINT else d + 1
+            if kind == REC_CHECKPOINT: self.checkpoints.append((i, d, a, b, seg))
+        self.segments = seg + 1
+
+    def close(self):
+        if self._jm: self._jm.close()
+        if self._cm: self._cm.close()
+        self._jf.close(); self._cf.close()
+
+    def record(self, i):
+        return RECORD.unpack_from(self._jm, i * RECORD.size)
+
+    def load_checkpoint(self, offset, length, game=None):
+        return binfmt.loads(bytes(self._cm[offset:offset + length]), game or CityGame())
+
+    def state_at(self, day, segment=-1):
+        """Stan miasta w dniu `day` (po akcjach z tego dnia): najbliższy checkpoint + odtworzenie ogona."""
+        if segment < 0: segment += self.segments
+        best = None
+        for cp in self.checkpoints:
+            if cp[4] == segment and cp[1] <= day: best = cp
+        if best is None: raise ValueError(f'Brak checkpointu dla dnia {day} w segmencie {segment}.')
+        idx, _, offset, length, _ = best
+        game = self.load_checkpoint(offset, length)
+        i = idx + 1
+        while i < self.count:
+            kind, code, _, d, a, b, c = self.record(i)
+            # rekord z innego segmentu (skok dnia) kończy odtwarzanie
+            if d != game.day: break
+            if kind == REC_CHECKPOINT:
+                # stan po akcji gracza jest wiążący - zamiast liczyć, wczytujemy go
+                game = self.load_checkpoint(a, b)
+            else:
+                if d >= day: break
+                produced, _ = game.end_day(code); game.rng.skip(1)
+                if (produced['money'], produced['wood'], produced['stone']) != (a, b, c):
+                    raise ValueError(f'Dziennik niespójny w dniu {d}.')
+            i += 1
+        if game.day != day: raise ValueError(f'Dziennik nie sięga dnia {day}.')
+        return game
+
+    def days(self, start=0, stop=None):
+        """Iteruje po (dzień, rzut, wydarzenie, money, wood, stone) z rekordów dni."""
+        for kind, roll, _, d, money, wood, stone in RECORD.iter_unpack(self._jm[start * RECORD.size:(stop or self.count) * RECORD.size]):
+            if kind == REC_DAY: yield d, roll, event_key(roll), money, wood, stone
+
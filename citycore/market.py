@@ -0,0 +1,235 @@
+# rynek surowców miasta: cena środkowa reaguje na handel i na dzienną produkcję,
+# a duże zlecenia wyceniamy po krzywej arkusza zleceń (order book) w O(log n).
+#
+# Arkusz ma stały kształt: poziom k zawiera BOOK_LOT * GROWTH**k sztuk, cena krańcowa
+# zależy od ilości przed poziomem. Skumulowane ilości i koszty poziomów są policzone
+# raz przy imporcie (w jednostkach ceny środkowej), więc wycena to bisect + jeden poziom.
+# Stan rynku miasta to tylko cena środkowa na surowiec i dzień ostatniej aktualizacji;
+# powrót ceny do równowagi między transakcjami liczymy w postaci zamkniętej (leniwie).
+import math
+from array import array
+from bisect import bisect_right
+
+RESOURCES = ('wood', 'stone')
+BOOK_LEVELS = 96
+BOOK_LOT = 10
+GROWTH = 1.15
+ASK_DEPTH = 20000.0      # zakup tylu sztuk podwaja cenę krańcową
+ASK_CAP = 3.0
+BID_DEPTH = 50000.0      # sprzedaż tylu sztuk obniża cenę krańcową do połowy
+BID_FLOOR = 0.5
+PERMANENT = 0.3          # część poślizgu, która zostaje w cenie po transakcji
+REVERT = 0.05            # dzienny powrót do ceny równowagi
+SUPPLY_REF = 500.0       # przy takiej dziennej produkcji cena równowagi spada o ~30%
+SUPPLY_ELASTICITY = 0.5
+HISTORY_DAYS = 365
+PRICE_SCALE = 1_000_000  # cena w zapisie: liczba całkowita (cena * PRICE_SCALE)
+
+
+class OrderBook:
+    """Jedna strona arkusza: skumulowana ilość Q[k] i koszt C[k] (w cenach środkowych) do poziomu k."""
+
+    def __init__(self, marginal):
+        self.qty = array('d', [0.0]); self.cost = array('d', [0.0]); self.price = array('d')
+        q = 0.0
+        for k in range(BOOK_LEVELS):
+            size = BOOK_LOT * GROWTH ** k
+            p = marginal(q + size / 2)
+            self.price.append(p)
+            q += size
+            self.qty.append(q); self.cost.append(self.cost[-1] + size * p)
+
+    def fill(self, qty):
+        """(koszt w cenach środkowych, cena krańcowa ostatniej sztuki) dla zlecenia qty."""
+        k = min(bisect_right(self.qty, qty) - 1, BOOK_LEVELS - 1)
+        return self.cost[k] + (qty - self.qty[k]) * self.price[k], self.price[k]
+
+
+ASKS = OrderBook(lambda q: min(ASK_CAP, 1 + q / ASK_DEPTH))
+BIDS = OrderBook(lambda q: max(BID_FLOOR, 1 - q / BID_DEPTH))
+
+
+class PriceHistory:
+    """Bufor cykliczny dziennych cen jednego surowca."""
+    __slots__ = ('data', 'head', 'size', 'last_day')
+
+    def __init__(self, capacity=HISTORY_DAYS):
+        self.data = array('d', bytes(8 * capacity)); self.head = 0; self.size = 0; self.last_day = None
+
+    def append(self, day, price):
+        self.data[self.head] = price
+        self.head = (self.head + 1) % len(self.data)
+        self.size = min(self.size + 1, len(self.data))
+        self.last_day = day
+
+    def values(self):
+        """Ceny od najstarszej do najnowszej."""
+        if self.size < len(self.data): return list(self.data[:self.size])
+        return list(self.data[self.head:]) + list(self.data[:self.head])
+
+    def copy(self):
+        c = PriceHistory.__new__(PriceHistory)
+        c.data = array('d', self.data); c.head = self.head; c.size = self.size; c.last_day = self.last_day
+        return c
+
+
+class Market:
+    """Rynek jednego miasta. Tworzony leniwie (game.market) - miasta, które nie handlują, nie płacą pamięcią."""
+    __slots__ = ('mid', 'day', 'history', 'trades', 'volume')
+
+    def __init__(self, config, day):
+        self.mid = {r: float(config.market_base[r]) for r in RESOURCES}
+        self.day = day
+        self.history = {r: PriceHistory() for r in RESOURCES}
+        self.trades = 0; self.volume = 0
+
+    def copy(self):
+        c = Market.__new__(Market)
+        c.mid = dict(self.mid); c.day = self.day; c.trades = self.trades; c.volume = self.volume
+        c.history = {r: h.copy() for r, h in self.history.items()}
+        return c
+
+    def state(self):
+        """Stan do zapisu: cena środkowa, dzień i liczniki. Historia cen nie jest zapisywana -
+        po wczytaniu zaczyna się od nowa (from_state)."""
+        return {'day': self.day, 'mid': {r: round(self.mid[r] * PRICE_SCALE) for r in RESOURCES},
+                'trades': self.trades, 'volume': self.volume}
+
+    @classmethod
+    def from_state(cls, config, state):
+        m = cls(config, int(state['day']))
+        for r, v in state.get('mid', {}).items():
+            if r in m.mid: m.mid[r] = int(v) / PRICE_SCALE
+        m.trades = int(state.get('trades', 0)); m.volume = int(state.get('volume', 0))
+        return m
+
+    @staticmethod
+    def equilibrium(config, res, daily_production):
+        base = config.market_base[res]
+        return base * (SUPPLY_REF / (SUPPLY_REF + max(0, daily_production))) ** SUPPLY_ELASTICITY
+
+    def sync(self, game):
+        """Dociąga rynek do game.day: cena wraca do równowagi (postać zamknięta), historia dostaje brakujące dni."""
+        days = game.day - self.day
+        if days <= 0: return
+        _, wood, stone, _, _, _ = game.daily_yields()
+        decay = 1 - REVERT
+        for res, prod in (('wood', wood), ('stone', stone)):
+            target = self.equilibrium(game.config, res, prod)
+            gap = self.mid[res] - target
+            hist = self.history[res]
+            for t in range(max(1, days - len(hist.data) + 1), days + 1):
+                hist.append(self.day + t, target + gap * decay ** t)
+            self.mid[res] = target + gap * decay ** days
+        self.day = game.day
+
+    def spreads(self, game):
+        cfg = game.config
+        buy, sell = cfg.buy_spread, cfg.sell_spread
+        if game.upgrades.get('market_reforms'):
+            buy = 1 + (buy - 1) / 2; sell = 1 - (1 - sell) / 2  # reformy zawężają spread o połowę
+        return buy, sell
+
+    def quote(self, game, side, res, qty):
+        """Cena całego zlecenia (int) - side = 'buy' albo 'sell'. O(log n) niezależnie od ilości."""
+        self.sync(game)
+        if qty <= 0: return 0
+        buy, sell = self.spreads(game)
+        if side == 'buy':
+            cost, _ = ASKS.fill(qty); return int(math.ceil(cost * self.mid[res] * buy))
+        cost, _ = BIDS.fill(qty); return int(cost * self.mid[res] * sell)
+
+    def execute(self, game, side, res, qty):
+        """Wycena + trwały wpływ zlecenia na cenę środkową. Zwraca cenę; zasoby zmienia wywołujący."""
+        price = self.quote(game, side, res, qty)
+        if side == 'buy':
+            _, marginal = ASKS.fill(qty); self.mid[res] *= 1 + (marginal - 1) * PERMANENT
+        else:
+            _, marginal = BIDS.fill(qty); self.mid[res] *= 1 - (1 - marginal) * PERMANENT
+        self.trades += 1; self.volume += qty
+        return price
+
+
+# --- handlarze skryptowi (do symulacji bez GUI) ---
+class SellSurplus:
+    """Sprzedaje wszystko ponad `keep` sztuk surowca, gdy cena środkowa >= min_price."""
+
+    def __init__(self, res, keep=0, min_price=0.0):
+        self.res = res; self.keep = keep; self.min_price = min_price
+
+    def act(self, game):
+        qty = getattr(game, self.res) - self.keep
+        if qty > 0 and game.market.mid[self.res] >= self.min_price: game.sell(self.res, qty)
+
+
+class BuyBelow:
+    """Kupuje `qty` sztuk, gdy cena środkowa spadnie poniżej `price`, a pieniędzy jest ponad `reserve`."""
+
+    def __init__(self, res, price, qty, reserve=0):
+        self.res = res; self.price = price; self.qty = qty; self.reserve = reserve
+
+    def act(self, game):
+        if game.market.mid[self.res] < self.price and game.money - game.quote('buy', self.res, self.qty) >= self.reserve:
+            game.buy(self.res, self.qty)
+
+
+class MeanReversion:
+    """Kupuje poniżej (1 - band) * baza, sprzedaje powyżej (1 + band) * baza, po `lot` sztuk."""
+
+    def __init__(self, res, band=0.1, lot=100):
+        self.res = res; self.band = band; self.lot = lot
+
+    def act(self, game):
+        base = game.config.market_base[self.res]; mid = game.market.mid[self.res]
+        if mid < base * (1 - self.band): game.buy(self.res, self.lot)
+        elif mid > base * (1 + self.band) and getattr(game, self.res) >= self.lot: game.sell(self.res, self.lot)
+
+
+TRADERS = {'sell_surplus': SellSurplus, 'buy_below': BuyBelow, 'mean_reversion': MeanReversion}
+
+
+def make_trader(spec):
+    """'sell_surplus:wood:keep=100' -> SellSurplus('wood', keep=100)."""
+    name, *args = spec.split(':')
+    pos = []; kw = {}
+    for a in args:
+        k, eq, v = a.partition('=')
+        val = v if eq else k
+        try: val = int(val)
+        except ValueError:
+            try: val = float(val)
+            except ValueError: pass
+        if eq: kw[k] = val
+        else: pos.append(val)
+    return TRADERS[name](*pos, **kw)
+
+
+def run_traders(game, days, traders, seed=None):
+    """Jak sim.simulate, ale po każdym dniu handlarze działają na rynku; wynik ma dodatkowo pole 'market'."""
+    import time
+    from .rng import CityRng
+    from .sim import EVENT_KEYS
+    if seed is not None: game.rng = CityRng(seed)
+    m = game.market
+    trades0, volume0 = m.trades, m.volume
+    produced = dict.fromkeys(('money', 'wood', 'stone'), 0)
+    events = dict.fromkeys(EVENT_KEYS, 0)
+    start_day = game.day
+    t0 = time.perf_counter()
+    for _ in range(days):
+        p, _ = game.end_day()
+        for k in produced: produced[k] += p[k]
+        events[game.last_event] += 1
+        for t in traders: t.act(game)
+    elapsed = time.perf_counter() - t0
+    return {
+        'days': days,
+        'start_day': start_day,
+        'end_day': game.day,
+        'produced': produced,
+        'events': events,
+        'market': {'trades': m.trades - trades0, 'volume': m.volume - volume0, 'mid': dict(m.mid)},
+        'final': game.to_dict(),
+        'elapsed': elapsed,
+        'days_per_sec': days / elapsed if elapsed > 0 else 0.0,
+    }
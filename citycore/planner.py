@@ -0,0 +1,317 @@
+# planer kolejności budowy: beam search po sekwencjach budowa / ulepszenie / czekanie,
+# cel = punkty prestiżu na dzień przebiegu (prestiż kończy plan).
+# python -m citycore.planner [--load plik] [--horizon 2000] [--beam 12] [--processes N] [--set param=v]
+#
+# Węzeł = stan miasta po akcji i `step` dniach modelu oczekiwanego (wydarzenia jako wartości
+# oczekiwane, bez losowania - tanio i deterministycznie). Dzieci stanu są memoizowane po kluczu
+# stanu (także między kolejnymi wywołaniami doradcy), a ten sam stan osiągnięty inną kolejnością
+# akcji jest scalany. Ocena pośrednia to liniowa projekcja dochodu do końca horyzontu; prestiż
+# liczymy dokładnie (prestige_value_if_reset / dni przebiegu). Najlepsze plany są na koniec
+# odgrywane prawdziwym silnikiem na kilku ziarnach (rollouty) - równolegle w puli procesów.
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from . import binfmt
+from .game import CityGame, BUILD_COSTS, UPGRADE_COSTS
+from .rng import CityRng
+
+HORIZON = 2000          # dni do przodu
+STEP = 25               # dni między decyzjami
+BEAM = 12
+CANDIDATES = 4          # ile najlepszych planów sprawdzać rolloutami
+ROLLOUT_SEEDS = 8
+ADVISOR_BUDGET_S = 0.8
+# oczekiwane dzienne skutki wydarzeń (szanse z CityGame.roll_event)
+EV_MONEY = 0.08 * 50 - 0.04 * 100          # dobry rok, skandal
+EV_HAPPY = 0.08 * 3 - 0.06 * 6 - 0.04 * 10  # migracja, pożar, skandal
+MIGRATION_PER_DAY = 0.08 * 5
+MEMO_MAX = 200_000
+WAIT = ('wait',)
+
+
+# memo żyje między pytaniami doradcy, więc klucz obejmuje też wszystko, od czego zależą dzieci:
+# mnożnik prestiżu, bonus menadżera, zdobyte nagrody (bity osiągnięć i questów), tabelę produkcji i config
+# (po id - dzieci w memo trzymają swój config, więc id nie zostanie użyte ponownie)
+def state_key(game):
+    return (game.day, game.money, game.population, game.happiness, game.wood, game.stone,
+            game.research_points, game._b.tobytes(), game._upg, game.rng.pos,
+            game.prestige_points, game.manager_bonus, game._ach, game._quests,
+            tuple(game._production.values()), id(game.config))
+
+
+def actions(game):
+    out = [WAIT]
+    for kind in BUILD_COSTS:
+        n = game.affordable(kind)
+        if n: out.append(('build', kind, n))
+        if n > 1: out.append(('build', kind, (n + 1) // 2))
+    for name, cost in UPGRADE_COSTS.items():
+        if game.research_points >= cost and not game.upgrades[name]: out.append(('upgrade', name))
+    return out
+
+
+def apply(game, action):
+    if action[0] == 'build': return game.build(action[1], action[2])[0]
+    if action[0] == 'upgrade': return game.buy_upgrade(action[1])[0]
+    return True
+
+
+def describe(action):
+    if action[0] == 'build': return f'Zbuduj {action[2]}x {action[1]}'
+    if action[0] == 'upgrade': return f'Kup ulepszenie {action[1]}'
+    if action[0] == 'prestige': return 'Prestiż'
+    return 'Czekaj'
+
+
+def advance(game, days):
+    end_day = game.end_day
+    for r in game.rng.take(days): end_day(r)
+
+
+def model_advance(game, days):
+    """Przewija `days` dni modelem oczekiwanym (jak production_day, wydarzenia uśrednione)."""
+    b_money, wood, stone, research, happy, mult = game.daily_yields()
+    mgr = 1 + game.manager_bonus / 100
+    money = game.money; pop = game.population; h = game.happiness
+    t = 0
+    while t < days:
+        hc = min(100, h + happy)
+        nh = max(0, hc + EV_HAPPY)
+        if nh == h: break
+        money += (b_money + pop * hc / 30 * mgr) * mult + EV_MONEY
+        h = nh; pop += MIGRATION_PER_DAY; t += 1
+    n = days - t
+    if n:
+        # szczęście w punkcie stałym: reszta to suma liniowo rosnącej populacji
+        hc = min(100, h + happy)
+        money += (b_money * n + (pop * n + MIGRATION_PER_DAY * n * (n - 1) / 2) * hc / 30 * mgr) * mult + EV_MONEY * n
+        pop += MIGRATION_PER_DAY * n
+    game.money = int(money); game.population = int(pop); game.happiness = int(h)
+    game.wood += wood * days; game.stone += stone * days; game.research_points += research * days
+    game.day += days; game.rng.skip(days)
+    game.normalize()
+    game.check_achievements(); game.check_quests()
+
+
+def prestige_rate(game):
+    """Punkty prestiżu na dzień przebiegu, gdyby zrobić prestiż teraz."""
+    return game.prestige_value_if_reset() / max(1, game.day - 1)
+
+
+def projected_rate(game, horizon_day):
+    # ciągła wersja prestige_value_if_reset na koniec horyzontu przy obecnym dochodzie;
+    # drewno i kamień nie mają tu wartości - liczą się tylko przez budynki, które za nie stoją
+    cfg = game.config
+    left = max(0, horizon_day - game.day)
+    b_money, _, _, _, happy, mult = game.daily_yields()
+    h_end = min(100, game.happiness + happy * left)
+    pop_end = game.population + MIGRATION_PER_DAY * left
+    base = (game.population + pop_end) * (game.happiness + h_end) / 4 / 30
+    money = game.money + (b_money + base * (1 + game.manager_bonus / 100)) * mult * left
+    value = money / cfg.prestige_money_req + pop_end / cfg.prestige_pop_req + horizon_day / 1000
+    return value / max(1, horizon_day - 1)
+
+
+class Node:
+    __slots__ = ('game', 'plan', 'score')
+
+    def __init__(self, game, plan, score):
+        self.game = game; self.plan = plan; self.score = score
+
+
+def expand_state(game, step):
+    """Wszystkie dzieci stanu: [(akcja, dziecko)]."""
+    out = []
+    for action in actions(game):
+        child = game.fork()
+        if not apply(child, action): continue
+        model_advance(child, step)
+        out.append((action, child))
+    return out
+
+
+# --- rollouty w puli procesów: grę przesyłamy w formacie binarnym zapisu (kilkadziesiąt bajtów) ---
+_worker_config = None
+
+
+def _init_worker(config):
+    global _worker_config
+    _worker_config = config
+
+
+def _load(data, config):
+    game = CityGame(config); binfmt.loads(data, game)
+    return game
+
+
+def replay(game, plan, prestige_day, seed=None):
+    """Odgrywa plan [(dzień, akcja)] prawdziwym silnikiem na forku gry (ew. z innym ziarnem) do prestige_day."""
+    g = game.fork()
+    if seed is not None: g.rng = CityRng(seed)
+    for day, action in plan:
+        if day > g.day: advance(g, day - g.day)
+        if action[0] == 'build':  # na innym ziarnie może brakować kilku sztuk - budujemy ile się da
+            action = ('build', action[1], min(action[2], g.affordable(action[1])))
+        apply(g, action)
+    if prestige_day > g.day: advance(g, prestige_day - g.day)
+    return g
+
+
+def _rollout_job(job):
+    data, plan, prestige_day, seeds = job
+    game = _load(data, _worker_config)
+    return [prestige_rate(replay(game, plan, prestige_day, s)) for s in seeds]
+
+
+class Planner:
+    """Beam search z memoizacją. processes > 1 rozkłada rollouty (prawdziwy silnik, wiele ziaren) na pulę procesów."""
+
+    def __init__(self, horizon=HORIZON, step=STEP, beam=BEAM, candidates=CANDIDATES,
+                 rollout_seeds=ROLLOUT_SEEDS, processes=1):
+        self.horizon = horizon; self.step = step; self.beam = beam
+        self.candidates = candidates; self.rollout_seeds = rollout_seeds
+        self.processes = processes
+        self.memo = {}     # (klucz stanu, krok) -> [(akcja, dziecko)]
+        self.hits = self.misses = 0
+        self._pool = None
+
+    def close(self):
+        if self._pool is not None: self._pool.terminate(); self._pool = None
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+    def pool(self, config):
+        if self._pool is None: self._pool = multiprocessing.Pool(self.processes, _init_worker, (config,))
+        return self._pool
+
+    def _children(self, nodes):
+        keys = [(state_key(n.game), self.step) for n in nodes]
+        todo = [i for i, k in enumerate(keys) if k not in self.memo]
+        self.hits += len(nodes) - len(todo); self.misses += len(todo)
+        if len(self.memo) + len(todo) > MEMO_MAX: self.memo.clear()
+        for i in todo: self.memo[keys[i]] = expand_state(nodes[i].game, self.step)
+        return [(n, self.memo[k]) for n, k in zip(nodes, keys)]
+
+    def search(self, game, deadline=None):
+        """Zwraca (najlepsze zakończenia [(tempo, plan, dzień prestiżu)], najlepszy węzeł bez prestiżu)."""
+        horizon_day = game.day + self.horizon
+        root = Node(game.fork(), (), projected_rate(game, horizon_day))
+        beam = [root]; finals = []
+        if game.can_prestige(): finals.append((prestige_rate(game), (), game.day))
+        while beam and beam[0].game.day < horizon_day:
+            if deadline is not None and time.perf_counter() > deadline: break
+            seen = {}
+            for parent, children in self._children(beam):
+                for action, child in children:
+                    k = state_key(child)
+                    if k in seen: continue  # ten sam stan inną drogą - ta sama ocena
+                    plan = parent.plan if action == WAIT else parent.plan + ((parent.game.day, action),)
+                    seen[k] = Node(child, plan, projected_rate(child, horizon_day))
+                    if child.can_prestige(): finals.append((prestige_rate(child), plan, child.day))
+            beam = sorted(seen.values(), key=lambda n: -n.score)[:self.beam]
+        finals.sort(key=lambda f: -f[0])
+        # jeden (najlepszy) dzień prestiżu na plan
+        best = {}
+        for f in finals: best.setdefault(f[1], f)
+        return list(best.values()), (beam[0] if beam else root)
+
+    def rollouts(self, game, finals):
+        """Średnie tempo każdego zakończenia na rollout_seeds ziarnach: [(średnia, min, tempo, plan, dzień)]."""
+        seeds = [game.rng.seed + 1 + i for i in range(self.rollout_seeds)]
+        if self.processes > 1:
+            data = binfmt.dumps(game)
+            rates = self.pool(game.config).map(_rollout_job, [(data, plan, day, seeds) for _, plan, day in finals])
+        else:
+            rates = [[prestige_rate(replay(game, plan, day, s)) for s in seeds] for _, plan, day in finals]
+        out = [(sum(r) / len(r), min(r), rate, plan, day) for r, (rate, plan, day) in zip(rates, finals)]
+        return sorted(out, key=lambda x: -x[0])
+
+    def plan(self, game, deadline=None):
+        t0 = time.perf_counter()
+        hits, misses = self.hits, self.misses
+        finals, best_open = self.search(game, deadline)
+        result = {'start_day': game.day, 'horizon_day': game.day + self.horizon, 'memo_hits': self.hits - hits,
+                  'memo_misses': self.misses - misses}
+        if finals:
+            top = finals[:self.candidates]
+            ranked = self.rollouts(game, top) if self.rollout_seeds else [(r, r, r, p, d) for r, p, d in top]
+            mean, worst, rate, plan, day = ranked[0]
+            result.update(rate=rate, rollout_mean=mean, rollout_min=worst, prestige_day=day,
+                          prestige_points=replay(game, plan, day).prestige_value_if_reset())
+        else:
+            plan = best_open.plan
+            result.update(rate=None, projected_rate=best_open.score, prestige_day=None)
+        result['plan'] = [(d, a) for d, a in plan]
+        result['elapsed'] = time.perf_counter() - t0
+        return result
+
+
+_advisor = None   # (config, horizon, Planner) - memo przeżywa kolejne pytania do doradcy
+
+
+def advise(game, budget_s=ADVISOR_BUDGET_S, horizon=HORIZON):
+    """Doradca do GUI: następna akcja wg planu, w czasie budget_s (w jednym procesie, bez rolloutów).
+
+    Zwraca {'action', 'text', 'plan', 'rate', 'prestige_day', ...}; action = ('prestige',), gdy
+    prestiż teraz daje najlepsze tempo. Gdy czas się skończy przed horyzontem, plan jest krótszy.
+    """
+    global _advisor
+    deadline = time.perf_counter() + budget_s
+    if _advisor is None or _advisor[0] is not game.config or _advisor[1] != horizon:
+        # dłuższy krok przy dalekim horyzoncie - żeby zmieścić się w czasie
+        _advisor = (game.config, horizon, Planner(horizon=horizon, step=max(STEP, horizon // 60), beam=8, rollout_seeds=0))
+    result = _advisor[2].plan(game, deadline)
+    plan = result['plan']
+    if result['prestige_day'] == game.day: action = ('prestige',)
+    elif plan and plan[0][0] == game.day: action = plan[0][1]
+    else: action = WAIT
+    text = describe(action)
+    if action is WAIT and plan: text += f' (następnie dnia {plan[0][0]}: {describe(plan[0][1])})'
+    result.update(action=action, text=text)
+    return result
+
+
+def main(argv=None):
+    from .sweep import make_config, _parse_value
+    ap = argparse.ArgumentParser(prog='python -m citycore.planner', description='Planer kolejności budowy (beam search).')
+    ap.add_argument('--load', help='stan początkowy z pliku zapisu (domyślnie nowa gra)')
+    ap.add_argument('--seed', type=int, default=1)
+    ap.add_argument('--horizon', type=int, default=HORIZON)
+    ap.add_argument('--step', type=int, default=STEP)
+    ap.add_argument('--beam', type=int, default=BEAM)
+    ap.add_argument('--candidates', type=int, default=CANDIDATES)
+    ap.add_argument('--rollouts', type=int, default=ROLLOUT_SEEDS, help='ile ziaren w rolloutach (0 = bez)')
+    ap.add_argument('--processes', type=int, default=1, help='0 = wszystkie rdzenie')
+    ap.add_argument('--set', action='append', default=[], metavar='PARAM=V',
+                    help='zmiana balansu jak w sweep, np. production.farm=10')
+    ap.add_argument('--json', action='store_true')
+    args = ap.parse_args(argv)
+    params = {}
+    for item in args.set:
+        key, _, value = item.partition('='); params[key.strip()] = _parse_value(value.strip())
+    game = CityGame(make_config(params), seed=args.seed)
+    if args.load:
+        ok, msg = game.load(args.load)
+        if not ok: print(msg, file=sys.stderr); return 1
+    processes = args.processes or os.cpu_count() or 1
+    with Planner(args.horizon, args.step, args.beam, args.candidates, args.rollouts, processes) as planner:
+        result = planner.plan(game)
+    if args.json:
+        json.dump(result, sys.stdout, ensure_ascii=False, indent=1); print(); return 0
+    for day, action in result['plan']: print(f'dzień {day:6d}: {describe(action)}')
+    if result['prestige_day'] is not None:
+        print(f'dzień {result["prestige_day"]:6d}: Prestiż ({result["prestige_points"]} pkt)')
+        print(f'tempo: {result["rate"]:.5f} pkt/dzień (rollouty: śr. {result["rollout_mean"]:.5f}, min {result["rollout_min"]:.5f})')
+    else:
+        print(f'brak prestiżu w horyzoncie; prognoza {result["projected_rate"]:.5f} pkt/dzień')
+    print(f'{result["elapsed"]:.2f}s, memo {result["memo_hits"]}/{result["memo_hits"] + result["memo_misses"]}', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
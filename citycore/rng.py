@@ -0,0 +1,68 @@
+# własny strumień losowości każdego miasta: stan to tylko (ziarno, pozycja)
+# Rzuty są generowane blokami: blok k zależy tylko od (ziarno, k), więc da się go
+# odtworzyć, przeskoczyć albo wylosować od razu na wiele dni.
+import os
+import random
+
+BLOCK = 1024
+ROLL_VALUES = range(100)
+
+
+def new_seed():
+    return int.from_bytes(os.urandom(8), 'little') >> 1
+
+
+class CityRng:
+    __slots__ = ('seed', 'pos', '_block', '_block_no')
+
+    def __init__(self, seed=None, pos=0):
+        self.seed = new_seed() if seed is None else int(seed)
+        self.pos = pos
+        self._block = None
+        self._block_no = -1
+
+    def _load(self, k):
+        self._block = random.Random(f'{self.seed}:{k}').choices(ROLL_VALUES, k=BLOCK)
+        self._block_no = k
+
+    def roll(self):
+        """Rzut 0..99 na jeden dzień."""
+        k, i = divmod(self.pos, BLOCK)
+        if k != self._block_no: self._load(k)
+        self.pos += 1
+        return self._block[i]
+
+    def take(self, n):
+        """Następne n rzutów naraz (te same, co n wywołań roll())."""
+        out = []
+        while n > 0:
+            k, i = divmod(self.pos, BLOCK)
+            if k != self._block_no: self._load(k)
+            part = self._block[i:i + n]
+            out += part; n -= len(part); self.pos += len(part)
+        return out
+
+    def skip(self, n):
+        self.pos += n
+
+    def warm(self):
+        """Generuje bieżący blok od razu (np. przy wczytaniu miasta), a nie przy pierwszym rzucie."""
+        k = self.pos // BLOCK
+        if k != self._block_no: self._load(k)
+
+    def stream(self, tag):
+        """Osobny generator do innych celów (np. próbkowanie w fast_forward), zależny od stanu."""
+        return random.Random(f'{self.seed}:{self.pos}:{tag}')
+
+    def copy(self):
+        c = CityRng(self.seed, self.pos)
+        c._block = self._block; c._block_no = self._block_no  # blok tylko czytamy - można dzielić
+        return c
+
+    def state(self):
+        return [self.seed, self.pos]
+
+    @classmethod
+    def from_state(cls, state):
+        seed, pos = state
+        return cls(seed, pos)
@@ -0,0 +1,121 @@
+# questy i osiągnięcia jako dane (rules.json) sprawdzane przez indeks po obserwowanej statystyce
+#
+# Reguła: {"id", "desc", "stat", "min", "reward"} - spełniona, gdy statystyka >= min.
+# stat to pole gry (money, population, happiness, wood, stone, research_points, day,
+# prestige_points) albo liczba budynków "buildings.<rodzaj>". Bit reguły = jej pozycja
+# w pliku, więc nowe reguły dopisuje się tylko na końcu (bity są częścią zapisu).
+#
+# Dla każdej statystyki reguły są posortowane po progu, a gra trzyma kursor (pierwsza
+# niezaliczona) i próg następnej. Dzienne sprawdzenie to jedno porównanie na statystykę,
+# niezależnie od liczby reguł; po przekroczeniu progu przechodzimy tylko przez przekroczone.
+import os
+from operator import attrgetter
+
+from .state import BUILDING_INDEX
+
+RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rules.json')
+STATS = ('money', 'population', 'happiness', 'wood', 'stone', 'research_points', 'day', 'prestige_points')
+REWARD_KEYS = ('money', 'research', 'wood', 'stone')
+NEVER = float('inf')
+
+
+class _BuildingCount:
+    __slots__ = ('i',)
+
+    def __init__(self, i): self.i = i
+    def __call__(self, game): return game._b[self.i]
+
+
+def stat_getter(stat):
+    if stat in STATS: return attrgetter(stat)
+    kind, _, name = stat.partition('.')
+    if kind == 'buildings' and name in BUILDING_INDEX: return _BuildingCount(BUILDING_INDEX[name])
+    raise ValueError(f'Nieznana statystyka w regule: {stat}')
+
+
+class RuleTable:
+    """Reguły jednego rodzaju (questy albo osiągnięcia) z indeksem po statystyce."""
+
+    def __init__(self, rules):
+        self.rules = tuple(rules)
+        self.keys = tuple(r['id'] for r in self.rules)
+        self.index = {k: i for i, k in enumerate(self.keys)}
+        if len(self.index) != len(self.keys): raise ValueError('Powtórzone id reguły.')
+        self.rewards = tuple(r['reward'] for r in self.rules)
+        self.stats = tuple(dict.fromkeys(r['stat'] for r in self.rules))
+        self.getters = tuple(stat_getter(s) for s in self.stats)
+        pos = {s: i for i, s in enumerate(self.stats)}
+        by_stat = [[] for _ in self.stats]
+        for bit, r in enumerate(self.rules): by_stat[pos[r['stat']]].append((r['min'], bit))
+        # (próg, bit) rosnąco - przy równych progach kolejność z pliku
+        self.by_stat = tuple(tuple(sorted(x)) for x in by_stat)
+
+    def __len__(self): return len(self.rules)
+
+    def watch(self, done):
+        """Stan indeksu dla zaliczonych bitów `done`: (kursory, progi, aktywne), patrz with_watch."""
+        cur = []; thr = []
+        for rules in self.by_stat:
+            c = 0
+            while c < len(rules) and done >> rules[c][1] & 1: c += 1
+            cur.append(c); thr.append(rules[c][0] if c < len(rules) else NEVER)
+        return self.with_watch(tuple(cur), tuple(thr))
+
+    def with_watch(self, cur, thr):
+        # aktywne = (getter, próg) tylko statystyk, które mają jeszcze niezaliczone reguły -
+        # gdy wszystko zaliczone, dzienne sprawdzenie nic nie robi
+        return cur, thr, tuple((get, th) for get, th in zip(self.getters, thr) if th != NEVER)
+
+    def advance(self, s, value, cursor, done):
+        """Statystyka `s` ma wartość `value`: zwraca (kursor, następny próg, bity nowo zaliczonych reguł)."""
+        rules = self.by_stat[s]; n = len(rules); hits = []
+        while cursor < n and rules[cursor][0] <= value:
+            bit = rules[cursor][1]
+            if not done >> bit & 1: hits.append(bit)
+            cursor += 1
+        # dalej mogą być reguły zaliczone wcześniej (np. wczytane z zapisu)
+        while cursor < n and done >> rules[cursor][1] & 1: cursor += 1
+        return cursor, (rules[cursor][0] if cursor < n else NEVER), hits
+
+
+class RuleSet:
+    def __init__(self, achievements, quests, path=None):
+        self.achievements = RuleTable(achievements)
+        self.quests = RuleTable(quests)
+        self.path = path
+
+    def __repr__(self): return f'RuleSet({self.path!r}, {len(self.achievements)} osiągnięć, {len(self.quests)} questów)'
+
+
+def _rule(raw, kind):
+    try:
+        rule = {'id': str(raw['id']), 'desc': raw.get('desc', raw['id']), 'stat': raw['stat'],
+                'min': int(raw['min']), 'reward': dict(raw.get('reward') or {})}
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f'Błędna reguła ({kind}): {raw!r}') from e
+    stat_getter(rule['stat'])
+    bad = set(rule['reward']) - set(REWARD_KEYS)
+    if bad: raise ValueError(f'Nieznana nagroda w regule {rule["id"]}: {", ".join(sorted(bad))}')
+    return rule
+
+
+def load_rules(path=RULES_FILE):
+    import json
+    with open(path, 'r', encoding='utf-8') as f: data = json.load(f)
+    return RuleSet([_rule(r, 'achievements') for r in data.get('achievements', [])],
+                   [_rule(r, 'quests') for r in data.get('quests', [])], path)
+
+
+_default = None
+
+
+def default_rules():
+    """Domyślny katalog (citycore/rules.json), wczytany przy pierwszym użyciu, a nie przy imporcie."""
+    global _default
+    if _default is None: _default = load_rules()
+    return _default
+
+
+def __getattr__(name):
+    if name == 'RULES': return default_rules()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
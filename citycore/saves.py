@@ -0,0 +1,179 @@
+# menedżer zapisów: katalog plików .city + mały indeks (JSON lines) z metadanymi do ekranu wczytywania
+#
+# Każdy zapis dopisuje do index.jsonl jedną linię {slot, name, day, money, prestige, saved_at, ...};
+# późniejsza linia tego samego slotu zastępuje wcześniejszą, usunięcie to linia z "deleted".
+# Lista zapisów czyta tylko indeks - pełny stan wczytuje się dopiero przy otwarciu slotu.
+# Gdy martwych linii jest dużo więcej niż żywych, indeks jest przepisywany (kompaktowanie).
+# Linia bez "slot" to metadane katalogu (np. {"legacy_imported": true}) - przeżywają kompaktowanie.
+import json
+import os
+import re
+import threading
+
+from . import binfmt
+from .fileio import atomic_write
+from .game import CityGame, SAVE_SLOTS
+
+SAVE_DIR = 'saves'
+INDEX_NAME = 'index.jsonl'
+SLOT_RE = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+COMPACT_SLACK = 64
+
+
+class SaveManager:
+    def __init__(self, directory=SAVE_DIR):
+        self.directory = directory
+        self.index_path = os.path.join(directory, INDEX_NAME)
+        self._lock = threading.Lock()
+        self._entries = None   # slot -> metadane; wczytywane przy pierwszym użyciu
+        self._meta = {}        # metadane katalogu (linie indeksu bez "slot")
+        self._lines = 0
+
+    def path(self, slot):
+        if not SLOT_RE.match(slot): raise ValueError(f'Nieprawidłowa nazwa slotu: {slot!r}')
+        return os.path.join(self.directory, slot + binfmt.BINARY_EXT)
+
+    # --- indeks ---
+    def _index(self):
+        if self._entries is not None: return self._entries
+        entries = {}; meta = {}; lines = 0
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try: e = json.loads(line)
+                    except ValueError: continue  # ucięta ostatnia linia po awarii
+                    lines += 1
+                    if 'slot' not in e: meta.update(e)
+                    elif e.get('deleted'): entries.pop(e['slot'], None)
+                    else: entries[e['slot']] = e
+        elif os.path.isdir(self.directory):
+            entries = self._scan(); lines = -1
+        self._entries, self._meta, self._lines = entries, meta, lines
+        if lines < 0: self._compact()
+        return entries
+
+    def _scan(self):
+        # brak indeksu - jednorazowo budujemy go z samych plików
+        entries = {}
+        for fn in os.listdir(self.directory):
+            slot, ext = os.path.splitext(fn)
+            if ext != binfmt.BINARY_EXT or not SLOT_RE.match(slot): continue
+            game = CityGame()
+            ok, _ = game.load(os.path.join(self.directory, fn))
+            if ok: entries[slot] = self._entry(slot, game)
+        return entries
+
+    def _entry(self, slot, game):
+        path = self.path(slot)
+        return {'slot': slot, 'name': game.playername, 'day': game.day, 'money': game.money,
+                'population': game.population, 'prestige': game.prestige_points,
+                'saved_at': game.saved_at, 'bytes': os.path.getsize(path) if os.path.exists(path) else 0}
+
+    def _append(self, entry):
+        with open(self.index_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._lines += 1
+        if self._lines > 2 * len(self._entries) + COMPACT_SLACK: self._compact()
+
+    def _compact(self):
+        lines = ([self._meta] if self._meta else []) + list(self._entries.values())
+        atomic_write(self.index_path, ''.join(json.dumps(e, ensure_ascii=False) + '\n' for e in lines))
+        self._lines = len(lines)
+
+    def rebuild_index(self):
+        """Odbudowuje indeks z plików (np. po ręcznym skopiowaniu zapisów do katalogu)."""
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            self._index()  # metadane katalogu (np. legacy_imported) zostają
+            self._entries = self._scan(); self._compact()
+        return len(self._entries)
+
+    # --- API ---
+    def list(self, sort='saved_at', reverse=True):
+        """Metadane wszystkich zapisów (bez czytania samych zapisów)."""
+        with self._lock:
+            entries = list(self._index().values())
+        return sorted(entries, key=lambda e: (e.get(sort) or 0, e['slot']), reverse=reverse)
+
+    def info(self, slot):
+        with self._lock: return self._index().get(slot)
+
+    def __contains__(self, slot):
+        return self.info(slot) is not None
+
+    def __len__(self):
+        with self._lock: return len(self._index())
+
+    def save(self, game, slot, stamp=True):
+        """Zapisuje grę do slotu i dopisuje jego linię do indeksu. Bezpieczne z wątku autozapisu.
+
+        stamp=False zachowuje game.saved_at (np. przy imporcie starego zapisu).
+        """
+        try: path = self.path(slot)
+        except ValueError as e: return False, str(e)
+        with self._lock:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                self._index()
+                if stamp:
+                    ok, msg = game.save(path)
+                    if not ok: return False, msg
+                else:
+                    binfmt.save_binary(game, path)
+                entry = self._entry(slot, game)
+                self._entries[slot] = entry
+                self._append(entry)
+            except OSError as e:
+                return False, str(e)
+        return True, f'Zapisano do slotu {slot}'
+
+    def load(self, slot, game):
+        """Wczytuje pełny stan slotu do `game` (dopiero teraz czytany jest plik zapisu)."""
+        try: path = self.path(slot)
+        except ValueError as e: return False, str(e)
+        ok, msg = game.load(path)
+        return (True, f'Wczytano slot {slot}.') if ok else (False, msg)
+
+    def delete(self, slot):
+        with self._lock:
+            if slot not in self._index(): return False, f'Brak slotu {slot}.'
+            try: os.remove(self.path(slot))
+            except FileNotFoundError: pass
+            del self._entries[slot]
+            self._append({'slot': slot, 'deleted': True})
+        return True, f'Usunięto slot {slot}.'
+
+    def new_slot(self, prefix='save'):
+        """Pierwsza wolna nazwa prefix-0001, prefix-0002, ..."""
+        with self._lock: taken = set(self._index())
+        n = len(taken) + 1
+        for i in range(1, n + 2):
+            slot = f'{prefix}-{i:04d}'
+            if slot not in taken: return slot
+
+    def import_file(self, filename, slot):
+        """Przenosi dowolny stary zapis (JSON, .city, city_save.txt) do slotu."""
+        game = CityGame()
+        with open(filename, 'rb') as f: head = f.read(4)
+        if head == binfmt.MAGIC or head.lstrip()[:1] == b'{': ok, msg = game.load(filename)
+        else: ok, msg = game.import_legacy_txt(filename)
+        if not ok: return False, msg
+        return self.save(game, slot, stamp=not game.saved_at)
+
+    def import_legacy_slots(self, files=SAVE_SLOTS):
+        """Stare city_save_slotN.json -> sloty slotN (tylko te, których jeszcze nie ma). Zwraca listę slotów.
+
+        Działa raz na katalog: potem indeks ma flagę legacy_imported, więc usunięty slot nie wraca
+        przy następnym starcie ze starego pliku.
+        """
+        with self._lock: self._index(); imported = self._meta.get('legacy_imported')
+        if imported: return []
+        done = []
+        for i, fn in enumerate(files, 1):
+            slot = f'slot{i}'
+            if os.path.exists(fn) and slot not in self and self.import_file(fn, slot)[0]: done.append(slot)
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            self._index(); self._meta['legacy_imported'] = True
+            self._append({'legacy_imported': True})
+        return done
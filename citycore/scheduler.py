@@ -0,0 +1,135 @@
+# auto-dzień ze zmienną prędkością: zegar o stałym kroku + wątek liczący dni na kopii miasta
+# GUI co klatkę pyta zegar, ile dni się należy, zleca je wątkowi i przyjmuje gotową partię.
+import threading
+import time
+
+SPEEDS = (1, 2, 5, 10, 50, 100, 500, 1000)
+BASE_DAY_S = 2.0          # 1x = jeden dzień na 2 s (jak dawny AUTO_DAY_INTERVAL_MS)
+MAX_CATCHUP_S = 5.0       # po dłuższym zawieszeniu nadrabiamy najwyżej tyle sekund gry
+MAX_DAYS_PER_TICK = 2000  # reszta zaległości przechodzi na kolejne klatki
+
+
+class DayClock:
+    """Stały krok czasu: akumuluje czas rzeczywisty * prędkość i oddaje całe dni."""
+
+    def __init__(self, speed=1, day_s=BASE_DAY_S, max_catchup_s=MAX_CATCHUP_S,
+                 max_per_tick=MAX_DAYS_PER_TICK, clock=time.monotonic):
+        self.day_s = day_s
+        self.max_catchup_s = max_catchup_s
+        self.max_per_tick = max_per_tick
+        self._clock = clock
+        self.speed = speed
+        self.debt = 0.0       # niewykorzystane dni (ułamek przechodzi na następną klatkę)
+        self.dropped = 0      # dni porzucone przez limit nadrabiania
+        self._last = None
+
+    def start(self):
+        self._last = self._clock(); self.debt = 0.0
+
+    def stop(self):
+        self._last = None
+
+    @property
+    def running(self):
+        return self._last is not None
+
+    def set_speed(self, speed):
+        self.speed = speed
+
+    def due(self):
+        """Ile pełnych dni wykonać teraz."""
+        if self._last is None: return 0
+        now = self._clock()
+        self.debt += (now - self._last) * self.speed / self.day_s
+        self._last = now
+        cap = max(1.0, self.max_catchup_s * self.speed / self.day_s)
+        if self.debt > cap:
+            self.dropped += int(self.debt - cap); self.debt = cap
+        n = min(int(self.debt), self.max_per_tick)
+        self.debt -= n
+        return n
+
+    def refund(self, n):
+        """Partia została odrzucona (gracz zmienił stan w trakcie) - dni wracają do kolejki."""
+        self.debt += n
+
+
+class DayBatch:
+    """Wynik partii dni policzonej na forku: gra po partii i wiersze (dzień, rzut, produkcja, opis, migawka)."""
+    __slots__ = ('source', 'token', 'game', 'rows')
+
+    def __init__(self, source, token, game, rows):
+        self.source = source; self.token = token; self.game = game; self.rows = rows
+
+
+def run_days(game, n, checkpoint_in=None, checkpoint_every=None):
+    """Liczy n dni na `game`. Migawka (fork) trafia do wiersza co checkpoint_every dni, licząc od checkpoint_in."""
+    rows = []
+    for i in range(1, n + 1):
+        produced, text = game.end_day()
+        snap = None
+        if checkpoint_in is not None and i >= checkpoint_in and (i - checkpoint_in) % checkpoint_every == 0:
+            snap = game.fork()
+        rows.append((game.day - 1, game.last_roll, produced, text, snap))
+    return rows
+
+
+class SimWorker:
+    """Wątek liczący partie dni; bez wątku (threaded=False) liczy od razu w submit()."""
+
+    def __init__(self, threaded=True):
+        self.threaded = threaded
+        self._cond = threading.Condition()
+        self._job = None
+        self._done = None
+        self._stop = False
+        self._thread = None
+        if threaded:
+            self._thread = threading.Thread(target=self._run, name='auto-day', daemon=True)
+            self._thread.start()
+
+    @property
+    def busy(self):
+        with self._cond: return self._job is not None
+
+    def submit(self, game, n, token=None, checkpoint_in=None, checkpoint_every=None):
+        """Zleca n dni. Liczone jest na game.fork(), więc `game` zostaje nietknięta."""
+        work = game.fork()
+        if game.telemetry is not None:
+            # wiersze eksportu czekają w forku, aż GUI przyjmie partię (patrz TelemetrySpool)
+            from .telemetry import TelemetrySpool
+            work.telemetry = TelemetrySpool()
+        job = (game, token, work, n, checkpoint_in, checkpoint_every)
+        if not self.threaded:
+            self._done = self._compute(job); return
+        with self._cond:
+            if self._job is not None: raise RuntimeError('Poprzednia partia dni jeszcze trwa.')
+            self._job = job
+            self._cond.notify()
+
+    def result(self):
+        """Gotowa partia (DayBatch) albo None."""
+        with self._cond:
+            done, self._done = self._done, None
+        return done
+
+    def close(self):
+        with self._cond:
+            self._stop = True
+            self._cond.notify()
+        if self._thread is not None: self._thread.join()
+
+    @staticmethod
+    def _compute(job):
+        source, token, work, n, checkpoint_in, checkpoint_every = job
+        return DayBatch(source, token, work, run_days(work, n, checkpoint_in, checkpoint_every))
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._job is None and not self._stop: self._cond.wait()
+                if self._stop: return
+                job = self._job
+            done = self._compute(job)
+            with self._cond:
+                self._done = done; self._job = None
@@ -0,0 +1,350 @@
+# serwer wielu miast: asyncio, jedno miasto = aktor, wspólny zegar dni i zapis write-behind
+# python -m citycore.server [--host 127.0.0.1] [--port 8765] [--db server_cities.db] [--day-s 2.0]
+# python -m citycore.server --loadtest 20000 [--seconds 10]   (serwer + klient na localhost)
+#
+# Protokół: jedna linia JSON na żądanie i na odpowiedź, po TCP.
+#   {"id": 1, "city": "ala", "op": "build", "args": {"kind": "farm", "n": 3}}
+#   {"id": 1, "ok": true, "msg": "Wybudowano farm. Ilość: 3", "state": {...}}
+# Aktor miasta nie ma własnego zadania: wszystkie wiadomości i dni obsługuje pętla zdarzeń
+# po kolei, a każda operacja na mieście jest synchroniczna, więc stan miasta zmienia naraz
+# tylko jeden kod (i 100k miast nie oznacza 100k zadań). Zegar co tick przewija wszystkie
+# wczytane miasta partiami po CHUNK, oddając pętlę między partiami - żądania czekają najwyżej
+# jedną partię. Zmienione miasta trafiają do zapisu co FLUSH_S (migawka binarna robiona
+# w pętli, zapis jedną transakcją SQLite w wątku piszącym, odczyty w puli wątków). Nieużywane miasta są zapisywane i zwalniane; przy
+# ponownym wczytaniu nadrabiają zaległe dni przez offline_progress.
+import argparse
+import asyncio
+import json
+import re
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import binfmt
+from .fastforward import offline_progress
+from .game import CityGame, GameConfig, ACTIONS
+from .instrument import Stats
+from .scheduler import DayClock, BASE_DAY_S, MAX_DAYS_PER_TICK
+
+SERVER_DB = 'server_cities.db'
+HOST = '127.0.0.1'
+PORT = 8765
+CHUNK = 512              # miast na partię ticka (potem oddajemy pętlę)
+TICK_S = 0.05            # jak często zegar sprawdza należne dni
+FLUSH_S = 5.0            # write-behind: zapis zmienionych miast co tyle sekund
+IDLE_S = 600.0           # miasto bez żądań przez tyle sekund jest zapisywane i zwalniane
+STORE_READERS = 4
+CITY_RE = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+MAX_LINE = 64 * 1024
+
+
+class CityStore:
+    """Miasta w jednej bazie SQLite (tabela city: id, bajty zapisu binarnego, czas zapisu).
+
+    Odczyty idą przez pulę wątków z własnymi połączeniami (WAL pozwala czytać równolegle
+    z zapisem), zapisy przez jeden wątek piszący: cała porcja write-behind to jedna transakcja,
+    czyli jeden fsync zamiast jednego na miasto.
+    """
+
+    def __init__(self, path=SERVER_DB, readers=STORE_READERS):
+        self.path = path
+        self._local = threading.local()
+        self.readers = ThreadPoolExecutor(readers, thread_name_prefix='store-read')
+        self.writer = ThreadPoolExecutor(1, thread_name_prefix='store-write')
+        with self._connect() as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('CREATE TABLE IF NOT EXISTS city (id TEXT PRIMARY KEY, data BLOB NOT NULL, saved_at INTEGER NOT NULL)')
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _db(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = self._local.db = self._connect()
+            db.execute('PRAGMA synchronous=NORMAL')
+        return db
+
+    def read(self, city):
+        row = self._db().execute('SELECT data FROM city WHERE id = ?', (city,)).fetchone()
+        return row[0] if row else None
+
+    def write_many(self, rows):
+        db = self._db()
+        with db: db.executemany('INSERT OR REPLACE INTO city (id, data, saved_at) VALUES (?, ?, ?)', rows)
+        return len(rows)
+
+    def count(self):
+        return self._db().execute('SELECT COUNT(*) FROM city').fetchone()[0]
+
+    async def load(self, city, config):
+        data = await asyncio.get_running_loop().run_in_executor(self.readers, self.read, city)
+        if data is None: return None
+        game = CityGame(config); binfmt.loads(data, game)
+        return game
+
+    async def save_many(self, rows):
+        """Zapisuje [(miasto, bajty, saved_at)] jedną transakcją w wątku piszącym."""
+        if not rows: return 0
+        return await asyncio.get_running_loop().run_in_executor(self.writer, self.write_many, rows)
+
+    def close(self):
+        self.readers.shutdown(wait=True); self.writer.shutdown(wait=True)
+
+
+class CityActor:
+    __slots__ = ('id', 'game', 'touched', 'dirty')
+
+    def __init__(self, city_id, game):
+        self.id = city_id; self.game = game; self.touched = time.monotonic(); self.dirty = False
+
+
+def city_state(game):
+    return {'name': game.playername, 'day': game.day, 'money': game.money, 'population': game.population,
+            'happiness': game.happiness, 'wood': game.wood, 'stone': game.stone,
+            'research_points': game.research_points, 'prestige_points': game.prestige_points,
+            'manager': game.manager, 'buildings': dict(game.buildings), 'upgrades': dict(game.upgrades)}
+
+
+# op -> funkcja(game, args) -> (ok, msg): akcje gracza z CityGame (te same co przyciski
+# CityGUI), odczyty i wsadowe 'batch' (lista akcji jako jedna transakcja)
+OPS = {
+    **ACTIONS,
+    'state': lambda g, a: (True, ''),
+    'quote': lambda g, a: (True, g.quote(a['side'], a['res'], int(a['qty']))),
+    'batch': lambda g, a: g.apply_batch(a['actions']),
+}
+READ_ONLY = frozenset(('state', 'quote'))
+
+
+class CityServer:
+    def __init__(self, store=None, day_s=BASE_DAY_S, chunk=CHUNK, flush_s=FLUSH_S, idle_s=IDLE_S, config=None):
+        self.store = store if store is not None else CityStore()
+        # offline_day_s = tempo zegara: miasto zwolnione z pamięci nadrabia dni tym samym tempem
+        self.config = config if config is not None else GameConfig(offline_day_s=day_s)
+        self.clock = DayClock(day_s=day_s, max_catchup_s=float('inf'), max_per_tick=MAX_DAYS_PER_TICK)
+        self.chunk = chunk; self.flush_s = flush_s; self.idle_s = idle_s
+        self.cities = {}
+        self._loading = {}     # miasto -> Future (dwa żądania naraz nie wczytują go dwa razy)
+        self.stats = Stats()
+        self._tasks = []
+        self._server = None
+
+    # --- aktorzy ---
+    async def actor(self, city_id):
+        a = self.cities.get(city_id)
+        if a is not None: return a
+        fut = self._loading.get(city_id)
+        if fut is not None: return await fut
+        fut = self._loading[city_id] = asyncio.get_running_loop().create_future()
+        try:
+            game = await self.store.load(city_id, self.config)
+            if game is None:
+                game = CityGame(self.config); game.playername = city_id; game.saved_at = int(time.time())
+            else:
+                r = offline_progress(game)
+                if r: self.stats.count('offline_days', r['days'])
+            game.rng.warm()  # blok rzutów liczony teraz, a nie w ticku wszystkich miast naraz
+            a = self.cities[city_id] = CityActor(city_id, game)
+            a.dirty = True
+            fut.set_result(a)
+        except BaseException as e:
+            # czekający dostają ten sam błąd; exception() oznacza go jako odebrany, żeby asyncio
+            # nie logowało "Future exception was never retrieved", gdy nikt nie czekał
+            if isinstance(e, asyncio.CancelledError): fut.cancel()
+            else: fut.set_exception(e); fut.exception()
+            raise
+        finally:
+            del self._loading[city_id]
+        return a
+
+    async def request(self, req):
+        """Obsługuje jedno żądanie (słownik) i zwraca odpowiedź - wspólne dla TCP i wywołań w procesie."""
+        t0 = time.perf_counter_ns()
+        rid = req.get('id'); op = req.get('op')
+        try:
+            if op == 'stats':
+                return {'id': rid, 'ok': True, 'cities': len(self.cities), 'day_debt': self.clock.debt,
+                        **self.stats.snapshot()}
+            city = req.get('city')
+            if not isinstance(city, str) or not CITY_RE.match(city): return {'id': rid, 'ok': False, 'msg': 'Nieprawidłowa nazwa miasta.'}
+            fn = OPS.get(op)
+            if fn is None: return {'id': rid, 'ok': False, 'msg': f'Nieznana operacja: {op}'}
+            a = await self.actor(city)
+            ok, msg = fn(a.game, req.get('args') or {})
+            a.touched = time.monotonic()
+            if ok and op not in READ_ONLY: a.dirty = True
+            return {'id': rid, 'ok': ok, 'msg': msg, 'state': city_state(a.game)}
+        except (KeyError, TypeError, ValueError, OverflowError) as e:
+            return {'id': rid, 'ok': False, 'msg': f'Błędne argumenty: {e}'}
+        finally:
+            self.stats.add('request', time.perf_counter_ns() - t0); self.stats.count('op.' + str(op))
+
+    # --- wspólny zegar ---
+    async def tick(self, days):
+        """Przewija wszystkie wczytane miasta o `days` dni, partiami po self.chunk."""
+        t0 = time.perf_counter_ns()
+        actors = list(self.cities.values())
+        for i in range(0, len(actors), self.chunk):
+            c0 = time.perf_counter_ns()
+            for a in actors[i:i + self.chunk]:
+                if self.cities.get(a.id) is not a: continue  # zwolnione w trakcie ticka
+                g = a.game
+                for r in g.rng.take(days): g.end_day(r)
+                a.dirty = True
+            self.stats.add('tick_chunk', time.perf_counter_ns() - c0)
+            await asyncio.sleep(0)
+        self.stats.add('tick', time.perf_counter_ns() - t0); self.stats.count('days', days)
+
+    async def run_clock(self):
+        self.clock.start()
+        while True:
+            await asyncio.sleep(TICK_S)
+            days = self.clock.due()
+            if days: await self.tick(days)
+
+    # --- write-behind ---
+    async def flush(self, evict=True):
+        now = time.monotonic(); stamp = int(time.time())
+        rows = []; idle = []
+        actors = list(self.cities.values())
+        for i in range(0, len(actors), self.chunk):
+            for a in actors[i:i + self.chunk]:
+                if a.dirty:
+                    a.game.saved_at = stamp
+                    rows.append((a.id, binfmt.dumps(a.game), stamp)); a.dirty = False
+                if evict and now - a.touched > self.idle_s: idle.append(a)
+            await asyncio.sleep(0)
+        t0 = time.perf_counter_ns()
+        n = await self.store.save_many(rows)
+        if n: self.stats.add('flush', time.perf_counter_ns() - t0); self.stats.count('saved', n)
+        for a in idle:
+            # zmienione w trakcie zapisu zostają do następnego razu
+            if not a.dirty and self.cities.get(a.id) is a: del self.cities[a.id]; self.stats.count('evicted')
+        return n
+
+    async def run_flush(self):
+        while True:
+            await asyncio.sleep(self.flush_s)
+            await self.flush()
+
+    # --- TCP ---
+    async def handle_conn(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line: break
+                try: req = json.loads(line)
+                except ValueError: resp = {'ok': False, 'msg': 'Nieprawidłowy JSON.'}
+                else: resp = await self.request(req) if isinstance(req, dict) else {'ok': False, 'msg': 'Oczekiwano obiektu JSON.'}
+                writer.write(json.dumps(resp, ensure_ascii=False).encode('utf-8') + b'\n')
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host=HOST, port=PORT):
+        self._server = await asyncio.start_server(self.handle_conn, host, port, limit=MAX_LINE)
+        self._tasks = [asyncio.create_task(self.run_clock()), asyncio.create_task(self.run_flush())]
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is not None: self._server.close(); await self._server.wait_closed()
+        for t in self._tasks: t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self.flush(evict=False)
+        self.store.close()
+
+
+class CityClient:
+    """Prosty klient (asyncio) do testów i skryptów: await client.call('ala', 'build', kind='farm').
+
+    Jedno połączenie = jedno żądanie naraz; równoległość to kilka połączeń.
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader; self.writer = writer; self._id = 0; self._lock = asyncio.Lock()
+
+    @classmethod
+    async def connect(cls, host=HOST, port=PORT):
+        return cls(*await asyncio.open_connection(host, port, limit=MAX_LINE))
+
+    async def call(self, city, op, **args):
+        async with self._lock:
+            self._id += 1
+            self.writer.write(json.dumps({'id': self._id, 'city': city, 'op': op, 'args': args}).encode('utf-8') + b'\n')
+            await self.writer.drain()
+            return json.loads(await self.reader.readline())
+
+    async def close(self):
+        self.writer.close(); await self.writer.wait_closed()
+
+
+async def loadtest(cities, seconds, db, day_s, clients=8):
+    """Serwer + klienci na localhost: tworzy `cities` miast i przez `seconds` s wysyła żądania."""
+    import random
+    server = CityServer(CityStore(db), day_s=day_s)
+    port = await server.start(HOST, 0)
+    conns = [await CityClient.connect(HOST, port) for _ in range(clients)]
+    names = [f'city{i}' for i in range(cities)]
+    t0 = time.perf_counter()
+
+    async def create(conn, part):
+        for n in part: await conn.call(n, 'state')
+
+    await asyncio.gather(*(create(c, names[i::clients]) for i, c in enumerate(conns)))
+    print(f'{cities} miast utworzonych w {time.perf_counter() - t0:.1f}s', file=sys.stderr)
+    latencies = []
+    ops = (('build', {'kind': 'farm'}), ('festival', {}), ('state', {}), ('sell', {'res': 'wood', 'qty': 1}))
+
+    async def worker(conn, rnd):
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            op, args = rnd.choice(ops)
+            t = time.perf_counter()
+            await conn.call(rnd.choice(names), op, **args)
+            latencies.append(time.perf_counter() - t)
+
+    await asyncio.gather(*(worker(c, random.Random(i)) for i, c in enumerate(conns)))
+    snap = (await server.request({'op': 'stats'}))
+    for c in conns: await c.close()
+    await server.stop()
+    latencies.sort()
+    pick = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+    tick = snap['timers'].get('tick', {}); chunk = snap['timers'].get('tick_chunk', {})
+    print(f'żądań: {len(latencies)} ({len(latencies) / seconds:.0f}/s), opóźnienie p50 {pick(0.5):.2f} ms, '
+          f'p99 {pick(0.99):.2f} ms, max {latencies[-1] * 1000:.2f} ms')
+    print(f'ticków: {tick.get("calls", 0)}, tick śr. {tick.get("mean_us", 0) / 1000:.1f} ms, max {tick.get("max_us", 0) / 1000:.1f} ms; '
+          f'partia max {chunk.get("max_us", 0) / 1000:.2f} ms; dni {snap["counters"].get("days", 0)}')
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog='python -m citycore.server', description='Serwer wielu miast (asyncio, JSON lines po TCP).')
+    ap.add_argument('--host', default=HOST)
+    ap.add_argument('--port', type=int, default=PORT)
+    ap.add_argument('--db', default=SERVER_DB, help='baza SQLite z miastami')
+    ap.add_argument('--day-s', type=float, default=BASE_DAY_S, help='sekund na dzień gry')
+    ap.add_argument('--readers', type=int, default=STORE_READERS, help='wątki odczytu z bazy')
+    ap.add_argument('--loadtest', type=int, metavar='MIAST', help='uruchom test obciążenia na localhost')
+    ap.add_argument('--seconds', type=float, default=10.0)
+    args = ap.parse_args(argv)
+    if args.loadtest:
+        asyncio.run(loadtest(args.loadtest, args.seconds, args.db, args.day_s)); return 0
+
+    async def serve():
+        server = CityServer(CityStore(args.db, args.readers), day_s=args.day_s)
+        port = await server.start(args.host, args.port)
+        print(f'serwer miast na {args.host}:{port}', file=sys.stderr)
+        try: await asyncio.Event().wait()
+        finally: await server.stop()
+
+    try: asyncio.run(serve())
+    except KeyboardInterrupt: pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,85 @@
+# headless symulacja: przewijanie wielu dni bez zapisu i odświeżania GUI
+import sys
+import time
+
+from .game import CityGame
+from .rng import CityRng, BLOCK
+
+EVENT_KEYS = ('calm', 'fire', 'good_year', 'migration', 'scandal')
+
+
+def simulate(days, seed=None, game=None):
+    """Przewija grę o `days` dni i zwraca zagregowane wyniki (bez zapisów i UI)."""
+    if game is None: game = CityGame()
+    if seed is not None: game.rng = CityRng(seed)
+    total_money = total_wood = total_stone = 0
+    events = dict.fromkeys(EVENT_KEYS, 0)
+    start_day = game.day
+    end_day = game.end_day
+    t0 = time.perf_counter()
+    left = days
+    while left > 0:
+        # rzuty pobierane blokiem - wynik identyczny jak przy end_day() dzień po dniu
+        rolls = game.rng.take(min(BLOCK, left)); left -= len(rolls)
+        for r in rolls:
+            produced, _ = end_day(r)
+            total_money += produced['money']; total_wood += produced['wood']; total_stone += produced['stone']
+            events[game.last_event] += 1
+    elapsed = time.perf_counter() - t0
+    return {
+        'days': days,
+        'start_day': start_day,
+        'end_day': game.day,
+        'produced': {'money': total_money, 'wood': total_wood, 'stone': total_stone},
+        'events': events,
+        'final': game.to_dict(),
+        'elapsed': elapsed,
+        'days_per_sec': days / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def _run(game, args):
+    if args.fast:
+        from .fastforward import fast_forward
+        return fast_forward(game, args.days, seed=args.seed)
+    return simulate(args.days, seed=args.seed, game=game)
+
+
+def main(argv=None):
+    import argparse
+    import json
+    ap = argparse.ArgumentParser(description='Headless symulacja miasta (bez tkinter).')
+    ap.add_argument('days', type=int, help='ile dni przewinąć')
+    ap.add_argument('--seed', type=int, default=None)
+    ap.add_argument('--load', help='plik zapisu, od którego zacząć')
+    ap.add_argument('--save', help='zapisz stan końcowy do pliku')
+    ap.add_argument('--fast', action='store_true', help='przybliżone przewijanie w O(1) (bez zmian budynków)')
+    ap.add_argument('--telemetry', metavar='PLIK', help='eksport dni do pliku .ctel (kolumnowy) albo .csv')
+    ap.add_argument('--stats', metavar='PLIK', help='włącz pomiary i dopisz ich zrzut (JSON lines) do pliku')
+    ap.add_argument('--profile', choices=('cprofile', 'sample'), help='uruchom pod profilerem')
+    ap.add_argument('--profile-out', metavar='PLIK', help='wynik profilera (domyślnie raport na stderr)')
+    args = ap.parse_args(argv)
+    if args.telemetry and args.fast: ap.error('--telemetry wymaga liczenia dzień po dniu (bez --fast)')
+    game = CityGame()
+    if args.stats:
+        from .instrument import Stats
+        game.stats = Stats()
+    if args.load:
+        ok, msg = game.load(args.load)
+        if not ok: print(msg, file=sys.stderr); return 1
+    if args.telemetry:
+        from .telemetry import Telemetry
+        try: game.telemetry = Telemetry(args.telemetry)
+        except OSError as e: print(e, file=sys.stderr); return 1
+    if args.profile:
+        from .instrument import profiled
+        with profiled(args.profile, args.profile_out): result = _run(game, args)
+    else:
+        result = _run(game, args)
+    if args.telemetry: game.telemetry.close(); result['telemetry'] = {'path': args.telemetry, 'rows': game.telemetry.rows}
+    if args.stats: game.stats.dump(args.stats, source='sim', days=args.days)
+    if args.save:
+        ok, msg = game.save(args.save)
+        if not ok: print(msg, file=sys.stderr); return 1
+    json.dump(result, sys.stdout, ensure_ascii=False, indent=2); print()
+    return 0
@@ -0,0 +1,73 @@
+# zwarty stan miasta: budynki w tablicy o stałym indeksie, ulepszenia/questy/osiągnięcia jako bity.
+# Widoki poniżej udają dawne słowniki/zbiory, żeby GUI i zapisy działały bez zmian.
+from collections.abc import MutableMapping, MutableSet
+
+BUILDING_KEYS = ("house", "pavilion", "workshop", "market", "farm", "sawmill", "quarry", "school", "hospital")
+BUILDING_INDEX = {k: i for i, k in enumerate(BUILDING_KEYS)}
+UPGRADE_KEYS = ("better_tools", "market_reforms", "reduced_build_costs", "manager_prod")
+
+
+class BuildingsView(MutableMapping):
+    """game.buildings - zapis idzie przez game.set_building (kopiowanie przy zapisie + invalidate)."""
+    __slots__ = ('_game',)
+
+    def __init__(self, game): self._game = game
+    def __getitem__(self, key): return self._game._b[BUILDING_INDEX[key]]
+    def __setitem__(self, key, value): self._game.set_building(key, value)
+    def __delitem__(self, key): raise TypeError('Nie można usunąć rodzaju budynku')
+    def __iter__(self): return iter(BUILDING_KEYS)
+    def __len__(self): return len(BUILDING_KEYS)
+    def __repr__(self): return repr(dict(self.items()))
+
+    def get(self, key, default=None):
+        i = BUILDING_INDEX.get(key)
+        return default if i is None else self._game._b[i]
+
+    def items(self): return zip(BUILDING_KEYS, self._game._b)
+    def values(self): return list(self._game._b)
+
+
+class FlagMap(MutableMapping):
+    """Słownik nazwa -> bool zapisany jako bity w atrybucie int gry (np. game._upg)."""
+    __slots__ = ('_game', '_attr', '_keys', '_index')
+
+    def __init__(self, game, attr, keys, index):
+        self._game = game; self._attr = attr; self._keys = keys; self._index = index
+
+    def __getitem__(self, key): return bool(getattr(self._game, self._attr) >> self._index[key] & 1)
+    def __setitem__(self, key, value): self._game.set_flag(self._attr, self._index[key], value)
+    def __delitem__(self, key): raise TypeError('Nie można usunąć flagi')
+    def __iter__(self): return iter(self._keys)
+    def __len__(self): return len(self._keys)
+    def __repr__(self): return repr(dict(self.items()))
+
+    def get(self, key, default=None):
+        i = self._index.get(key)
+        return default if i is None else bool(getattr(self._game, self._attr) >> i & 1)
+
+
+class FlagSet(MutableSet):
+    """Zbiór nazw zapisany jako bity; nieznane nazwy są ignorowane."""
+    __slots__ = ('_game', '_attr', '_keys', '_index')
+
+    def __init__(self, game, attr, keys, index):
+        self._game = game; self._attr = attr; self._keys = keys; self._index = index
+
+    def __contains__(self, key):
+        i = self._index.get(key)
+        return i is not None and bool(getattr(self._game, self._attr) >> i & 1)
+
+    def __iter__(self):
+        bits = getattr(self._game, self._attr)
+        return iter([k for i, k in enumerate(self._keys) if bits >> i & 1])
+
+    def __len__(self): return bin(getattr(self._game, self._attr)).count('1')
+    def __repr__(self): return repr(set(self))
+
+    def add(self, key):
+        i = self._index.get(key)
+        if i is not None: self._game.set_flag(self._attr, i, True)
+
+    def discard(self, key):
+        i = self._index.get(key)
+        if i is not None: self._game.set_flag(self._attr, i, False)
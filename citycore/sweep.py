@@ -0,0 +1,126 @@
+# sweep parametrów balansu: siatka wartości GameConfig rozłożona na wszystkie rdzenie
+# python -m citycore.sweep --days 5000 --out wyniki.jsonl --set buy_spread=1.1,1.25 --set production.farm=6,8,10
+import argparse
+import copy
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+from .game import CityGame, GameConfig
+from .market import make_trader, run_traders
+from .sim import simulate
+
+
+def grid(axes):
+    """{'buy_spread': [1.1, 1.25], 'production.farm': [6, 8]} -> lista słowników parametrów."""
+    keys = list(axes)
+    return [dict(zip(keys, values)) for values in itertools.product(*(axes[k] for k in keys))]
+
+
+def make_config(params, base=None):
+    """Buduje GameConfig z parametrów; klucze z kropką wchodzą do słowników (market_base.wood)."""
+    cfg = copy.deepcopy(base) if base is not None else GameConfig()
+    for key, value in params.items():
+        name, _, sub = key.partition('.')
+        if not hasattr(cfg, name): raise KeyError(f'Nieznany parametr: {key}')
+        if sub: getattr(cfg, name)[sub] = value
+        else: setattr(cfg, name, value)
+    return cfg
+
+
+def run_seed(base_seed, index):
+    # ziarno zależy tylko od (base_seed, numer runu) - niezależnie od procesu i kolejności
+    return random.Random(f'{base_seed}:{index}').getrandbits(63)
+
+
+def run_one(job):
+    index, params, days, seed, start, traders = job
+    game = CityGame(make_config(params))
+    if start:
+        game.from_dict(start)
+        # tabela produkcji z zapisu nie może przykryć osi sweepu (production.*)
+        prod = {k.partition('.')[2]: v for k, v in params.items() if k.startswith('production.')}
+        if prod: game.production = {**game.production, **prod}
+    if traders: result = run_traders(game, days, [make_trader(t) for t in traders], seed=seed)
+    else: result = simulate(days, seed=seed, game=game)
+    row = {
+        'run': index,
+        'seed': seed,
+        'params': params,
+        'days': days,
+        'money': game.money,
+        'population': game.population,
+        'happiness': game.happiness,
+        'wood': game.wood,
+        'stone': game.stone,
+        'research_points': game.research_points,
+        'prestige_value': game.prestige_value_if_reset(),
+        'produced': result['produced'],
+        'events': result['events'],
+    }
+    if traders: row['market'] = result['market']
+    return row
+
+
+def sweep(param_grid, days, out_path, base_seed=0, processes=None, start=None, traders=()):
+    """Uruchamia symulację dla każdego punktu siatki i dopisuje wyniki (JSON lines) do out_path.
+
+    Wyniki przychodzą w kolejności zakończenia; pole 'run' wskazuje punkt siatki.
+    traders = opisy handlarzy skryptowych (market.make_trader), np. ['sell_surplus:wood:keep=100'].
+    Zwraca liczbę zapisanych wyników.
+    """
+    jobs = [(i, params, days, run_seed(base_seed, i), start, tuple(traders)) for i, params in enumerate(param_grid)]
+    processes = processes or os.cpu_count() or 1
+    chunksize = max(1, len(jobs) // (processes * 8))
+    count = 0
+    with open(out_path, 'a', encoding='utf-8') as out, multiprocessing.Pool(processes) as pool:
+        for row in pool.imap_unordered(run_one, jobs, chunksize=chunksize):
+            out.write(json.dumps(row, ensure_ascii=False) + '\n')
+            count += 1
+            if count % 256 == 0: out.flush()
+    return count
+
+
+def _parse_value(text):
+    for conv in (int, float):
+        try: return conv(text)
+        except ValueError: pass
+    return text
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Sweep parametrów ekonomii na wielu rdzeniach.')
+    ap.add_argument('--days', type=int, required=True)
+    ap.add_argument('--out', required=True, help='plik wyników (JSON lines, dopisywany)')
+    ap.add_argument('--set', action='append', default=[], metavar='PARAM=V1,V2,...',
+                    help='oś siatki, np. buy_spread=1.1,1.25 albo market_base.wood=8,10')
+    ap.add_argument('--seed', type=int, default=0, help='bazowe ziarno')
+    ap.add_argument('--repeat', type=int, default=1, help='ile powtórzeń każdego punktu (różne ziarna)')
+    ap.add_argument('--processes', type=int, default=None)
+    ap.add_argument('--load', help='stan początkowy z pliku zapisu (JSON, .city albo city_save.txt)')
+    ap.add_argument('--trader', action='append', default=[], metavar='NAZWA:ARG:K=V',
+                    help='handlarz skryptowy w każdym runie, np. sell_surplus:wood:keep=100 albo mean_reversion:stone:band=0.1')
+    args = ap.parse_args(argv)
+    axes = {}
+    for item in args.set:
+        key, _, values = item.partition('=')
+        axes[key.strip()] = [_parse_value(v.strip()) for v in values.split(',') if v.strip()]
+    points = grid(axes) * args.repeat
+    start = None
+    if args.load:
+        game = CityGame()
+        ok, msg = game.load(args.load)
+        if not ok: print(msg, file=sys.stderr); return 1
+        start = game.to_dict()
+    t0 = time.perf_counter()
+    n = sweep(points, args.days, args.out, base_seed=args.seed, processes=args.processes, start=start, traders=args.trader)
+    print(f'{n} runów w {time.perf_counter() - t0:.1f}s -> {args.out}', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
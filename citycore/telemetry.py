@@ -0,0 +1,290 @@
+"""Telemetria dni: strumieniowy eksport szeregów czasowych z długich przebiegów symulacji.
+
+    game.telemetry = Telemetry('run.ctel')    # albo 'run.csv'
+    simulate(5_000_000, game=game)
+    game.telemetry.close()
+
+CityGame.end_day po każdym dniu woła record(game), który wpisuje pola do list o stałej
+długości chunk_rows (po jednej na kolumnę) - samo przypisanie referencji, bez konwersji.
+Typy kolumn nadaje dopiero zrzut pełnego bufora: struct.pack całej kolumny jest kilka razy
+tańszy niż zapis liczby do array dzień po dniu. Wydarzenie wynika z rzutu, więc też liczymy
+je przy zrzucie; liczniki budynków zmieniają się rzadko - zapamiętujemy tylko wiersze, od
+których są inne, i tak je zapisujemy (RLE). Pamięć nie zależy od długości przebiegu.
+Forki miasta (planer, auto-dzień) nie dziedziczą eksportu.
+
+Format kolumnowy (.ctel):
+
+    magic     4 bajty  b'CTEL'
+    version   1 bajt   FORMAT_VERSION
+    header    u32 długość + JSON {"columns": [[nazwa, typecode, kodowanie], ...], "events": EVENT_KEYS}
+    fragmenty każdy: u32 liczba wierszy n, u32 długość reszty fragmentu w bajtach,
+              potem kolejne kolumny:
+                plain  n wartości
+                rle    u32 liczba serii k, k długości serii (u32), k wartości
+              (little-endian; typecode jak w module array: q = int64, b = int8, B = uint8)
+
+Wiersz to stan po end_day: day jak w zapisie gry (dzień, który się zaczyna), roll i event
+(indeks w EVENT_KEYS) dotyczą dnia, który się właśnie skończył. Fragmenty trafiają do pliku
+w całości, więc po przerwanym przebiegu czytelne zostaje wszystko do ostatniego pełnego
+fragmentu. Plik .csv to wersja zapasowa dla narzędzi bez czytnika: te same kolumny,
+wydarzenie jako nazwa (kilka razy wolniejszy zapis i większy plik).
+"""
+import csv
+import json
+import struct
+import sys
+from array import array
+from operator import attrgetter
+
+from .game import event_key
+from .sim import EVENT_KEYS
+from .state import BUILDING_KEYS
+
+MAGIC = b'CTEL'
+FORMAT_VERSION = 1
+CHUNK_ROWS = 8192
+U32 = struct.Struct('<I')
+CHUNK_HEAD = struct.Struct('<II')
+# kolumny zapisywane co dzień (kolejność jak w Telemetry.record), potem event i budynki
+DAILY_COLUMNS = (('day', 'q'), ('roll', 'b'), ('money', 'q'), ('population', 'q'), ('happiness', 'b'),
+                 ('wood', 'q'), ('stone', 'q'), ('research', 'q'), ('prestige', 'q'))
+COLUMNS = (tuple((name, tc, 'plain') for name, tc in DAILY_COLUMNS + (('event', 'B'),))
+           + tuple((f'buildings.{k}', 'q', 'rle') for k in BUILDING_KEYS))
+COLUMN_NAMES = tuple(c[0] for c in COLUMNS)
+_EVENT_COL = COLUMN_NAMES.index('event')
+# wydarzenie wynika z rzutu: tablica dla bytes.translate (rzut -1 = bajt 255 = jeszcze bez dnia)
+_EVENT_TABLE = bytes(EVENT_KEYS.index(event_key(r)) for r in range(256))
+_UNSEEN = object()
+_row = attrgetter('day', 'last_roll', 'money', 'population', 'happiness', 'wood', 'stone',
+                  'research_points', 'prestige_points')
+
+
+def _rle(runs, i):
+    """Serie (długość, liczniki budynków) -> długości i wartości serii jednej kolumny (sąsiednie równe sklejone)."""
+    lengths = []; values = []
+    for length, counts in runs:
+        v = counts[i]
+        if values and values[-1] == v: lengths[-1] += length
+        else: lengths.append(length); values.append(v)
+    return lengths, values
+
+
+def _expand(runs, i):
+    col = array('q')
+    for length, counts in runs: col.extend(array('q', (counts[i],)) * length)
+    return col
+
+
+class ColumnarSink:
+    def __init__(self, path):
+        self.f = open(path, 'wb')
+        head = json.dumps({'columns': COLUMNS, 'events': EVENT_KEYS}).encode('utf-8')
+        self.f.write(MAGIC + bytes([FORMAT_VERSION]) + U32.pack(len(head)) + head)
+
+    def write(self, n, columns, runs):
+        # kolumny dzienne przychodzą jako listy, roll i event jako gotowe bajty
+        parts = [struct.pack(f'<{n}{tc}', *col) if isinstance(col, list) else bytes(col)
+                 for (_, tc, _), col in zip(COLUMNS, columns)]
+        for i, (_, tc, _) in enumerate(COLUMNS[len(columns):]):
+            lengths, values = _rle(runs, i); k = len(values)
+            parts.append(U32.pack(k) + struct.pack(f'<{k}I', *lengths) + struct.pack(f'<{k}{tc}', *values))
+        self.f.write(CHUNK_HEAD.pack(n, sum(map(len, parts))))
+        self.f.write(b''.join(parts))
+        self.f.flush()
+
+    def close(self): self.f.close()
+
+
+class CsvSink:
+    def __init__(self, path):
+        self.f = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.f)
+        self.writer.writerow(COLUMN_NAMES)
+
+    def write(self, n, columns, runs):
+        self.write_columns(list(columns) + [_expand(runs, i) for i in range(len(BUILDING_KEYS))])
+
+    def write_columns(self, columns):
+        """Pełne kolumny w kolejności COLUMNS (event jako indeks w EVENT_KEYS)."""
+        columns[_EVENT_COL] = [EVENT_KEYS[c] for c in columns[_EVENT_COL]]
+        self.writer.writerows(zip(*columns))
+        self.f.flush()
+
+    def close(self): self.f.close()
+
+
+SINKS = {'columnar': ColumnarSink, 'csv': CsvSink}
+
+
+class Telemetry:
+    """Eksporter dni podpinany pod grę (game.telemetry); format z rozszerzenia, chyba że podano `format`."""
+
+    def __init__(self, path, format=None, chunk_rows=CHUNK_ROWS):
+        if format is None: format = 'csv' if path.lower().endswith('.csv') else 'columnar'
+        if format not in SINKS: raise ValueError(f'Nieznany format telemetrii: {format}')
+        self.path = path; self.format = format
+        self.sink = SINKS[format](path)
+        self.chunk_rows = chunk_rows
+        self.written = 0
+        # bufor: po jednej liście o stałej długości na kolumnę dzienną
+        self._cols = tuple([0] * chunk_rows for _ in DAILY_COLUMNS)
+        self._n = 0
+        # (wiersz we fragmencie, liczniki budynków od tego wiersza); _b = ostatnio widziany stan,
+        # _yields = ostatnio widziany game._yields (każda zmiana budynków go unieważnia; na start
+        # znacznik, którym nie jest nawet None - pierwszy wiersz zawsze zapisuje budynki)
+        self._marks = []; self._b = None; self._yields = _UNSEEN
+
+    @property
+    def rows(self): return self.written + self._n
+
+    def record(self, game):
+        n = self._n
+        day, roll, money, population, happiness, wood, stone, research, prestige = self._cols
+        day[n] = game.day; roll[n] = game.last_roll; money[n] = game.money; population[n] = game.population
+        happiness[n] = game.happiness; wood[n] = game.wood; stone[n] = game.stone
+        research[n] = game.research_points; prestige[n] = game.prestige_points
+        if game._yields is not self._yields:
+            self._yields = game._yields
+            if game._b != self._b: self._b = array('q', game._b); self._marks.append((n, tuple(self._b)))
+        self._n = n = n + 1
+        if n == self.chunk_rows: self.flush()
+
+    def append(self, row, buildings):
+        """Wiersz zebrany gdzie indziej (TelemetrySpool): krotka w kolejności DAILY_COLUMNS."""
+        n = self._n
+        for col, v in zip(self._cols, row): col[n] = v
+        if self._b is None or tuple(self._b) != buildings:
+            self._b = array('q', buildings); self._marks.append((n, buildings))
+        self._yields = _UNSEEN
+        self._n = n = n + 1
+        if n == self.chunk_rows: self.flush()
+
+    def flush(self):
+        """Dopisuje zebrane wiersze jako jeden fragment."""
+        n = self._n
+        if not n: return
+        # pełny bufor idzie bez kopiowania - sink zużywa kolumny przed powrotem
+        columns = list(self._cols) if n == self.chunk_rows else [col[:n] for col in self._cols]
+        rolls = struct.pack(f'<{n}b', *columns[1])
+        columns[1] = array('b', rolls)
+        columns.append(rolls.translate(_EVENT_TABLE))
+        marks = self._marks + [(n, None)]
+        runs = [(stop - start, counts) for (start, counts), (stop, _) in zip(marks, marks[1:]) if stop > start]
+        self.sink.write(n, columns, runs)
+        self.written += n; self._n = 0
+        self._marks = [(0, self._marks[-1][1])]
+
+    def close(self):
+        self.flush(); self.sink.close()
+
+
+class TelemetrySpool:
+    """Wiersze dni liczonych na forku (auto-dzień w wątku); do eksportu trafiają dopiero po przyjęciu partii."""
+
+    def __init__(self): self.rows = []
+
+    def record(self, game): self.rows.append((_row(game), tuple(game._b)))
+
+    def drain_into(self, telemetry):
+        for row, buildings in self.rows: telemetry.append(row, buildings)
+        self.rows = []
+
+
+# --- odczyt ---
+def _open(path):
+    f = open(path, 'rb')
+    try:
+        if f.read(4) != MAGIC: raise ValueError(f'{path}: to nie jest plik telemetrii (.ctel).')
+        version = f.read(1)[0]
+        if version > FORMAT_VERSION: raise ValueError(f'{path}: nieobsługiwana wersja telemetrii {version}.')
+        (size,) = U32.unpack(f.read(4))
+        head = json.loads(f.read(size).decode('utf-8'))
+    except Exception:
+        f.close(); raise
+    return f, [tuple(c) for c in head['columns']]
+
+
+def _column(data, pos, n, tc, enc):
+    """Dekoduje kolumnę z bajtów fragmentu od `pos`; zwraca (array, pozycja za kolumną)."""
+    w = array(tc).itemsize
+    col = array(tc)
+    if enc == 'plain':
+        col.frombytes(data[pos:pos + n * w]); pos += n * w
+    else:
+        (k,) = U32.unpack_from(data, pos); pos += 4
+        lengths = struct.unpack_from(f'<{k}I', data, pos); pos += 4 * k
+        values = struct.unpack_from(f'<{k}{tc}', data, pos); pos += w * k
+        for length, v in zip(lengths, values): col.extend(array(tc, (v,)) * length)
+        return col, pos
+    if sys.byteorder == 'big': col.byteswap()
+    return col, pos
+
+
+def _skip(data, pos, n, tc, enc):
+    w = array(tc).itemsize
+    if enc == 'plain': return pos + n * w
+    (k,) = U32.unpack_from(data, pos)
+    return pos + 4 + k * (4 + w)
+
+
+def iter_chunks(path, names=None):
+    """Fragment po fragmencie: {nazwa: array}. Dekoduje tylko kolumny z `names`."""
+    f, schema = _open(path)
+    with f:
+        known = [c[0] for c in schema]
+        if names is None: names = known
+        bad = set(names) - set(known)
+        if bad: raise ValueError(f'Nieznane kolumny: {", ".join(sorted(bad))}')
+        while True:
+            head = f.read(CHUNK_HEAD.size)
+            if len(head) < CHUNK_HEAD.size: return
+            n, size = CHUNK_HEAD.unpack(head)
+            data = f.read(size)
+            if len(data) < size: return  # ucięty ostatni fragment
+            chunk = {}; pos = 0
+            for name, tc, enc in schema:
+                if name in names: chunk[name], pos = _column(data, pos, n, tc, enc)
+                else: pos = _skip(data, pos, n, tc, enc)
+            yield chunk
+
+
+def read_columns(path, names=None):
+    """Całe kolumny pliku .ctel: {nazwa: array}."""
+    out = {}
+    for chunk in iter_chunks(path, names):
+        for name, col in chunk.items():
+            if name in out: out[name].extend(col)
+            else: out[name] = col
+    return out
+
+
+def to_csv(path, out):
+    """Przepisuje plik .ctel do CSV fragment po fragmencie (stała pamięć). Zwraca liczbę wierszy."""
+    sink = CsvSink(out); rows = 0
+    try:
+        for chunk in iter_chunks(path, COLUMN_NAMES):
+            rows += len(chunk['day'])
+            sink.write_columns([chunk[name] for name in COLUMN_NAMES])
+    finally:
+        sink.close()
+    return rows
+
+
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(prog='python -m citycore telemetry', description='Podgląd i konwersja telemetrii dni (.ctel).')
+    ap.add_argument('path', help='plik .ctel')
+    ap.add_argument('--csv', metavar='PLIK', help='przepisz do CSV')
+    args = ap.parse_args(argv)
+    try:
+        if args.csv: print(f'{to_csv(args.path, args.csv)} wierszy -> {args.csv}'); return 0
+        rows = 0; first = last = None
+        for chunk in iter_chunks(args.path):
+            if first is None: first = {k: v[0] for k, v in chunk.items()}
+            rows += len(chunk['day']); last = {k: v[-1] for k, v in chunk.items()}
+    except (OSError, ValueError) as e:
+        print(e, file=sys.stderr); return 1
+    for row in (first, last):
+        if row: row['event'] = EVENT_KEYS[row['event']]
+    json.dump({'rows': rows, 'columns': COLUMN_NAMES, 'first': first, 'last': last}, sys.stdout, indent=2); print()
+    return 0
@@ -0,0 +1,222 @@
+# wektorowa symulacja wielu niezależnych miast naraz (Monte Carlo do balansu)
+# układ "struct of arrays": każda statystyka to kolumna NumPy, jedno miasto = jeden wiersz.
+# Wynik jest bit w bit taki sam jak CityGame.end_day dla tych samych ziaren.
+import numpy as np
+
+from .game import CityGame, event_key
+from .rng import CityRng
+from .rules import STATS
+from .state import BUILDING_KEYS, BUILDING_INDEX
+
+ROLL_BLOCK = 1024
+_NEVER = np.iinfo(np.int64).max
+
+_effective_count = CityGame().effective_count
+
+
+class CityBatch:
+    def __init__(self, games, seeds=None):
+        self.games = list(games)
+        n = len(self.games)
+        if seeds is not None:
+            for g, s in zip(self.games, seeds): g.rng = CityRng(s)
+
+        def col(attr): return np.array([getattr(g, attr) for g in self.games], dtype=np.int64)
+        self.day = col('day'); self.money = col('money'); self.population = col('population')
+        self.happiness = col('happiness'); self.wood = col('wood'); self.stone = col('stone')
+        self.research = col('research_points'); self.manager_bonus = col('manager_bonus')
+        self.prestige_mult = np.array([1.0 + g.prestige_points * 0.02 for g in self.games])
+        self.buildings = np.array([list(g._b) for g in self.games], dtype=np.int64).reshape(n, len(BUILDING_KEYS))
+        # tabela produkcji może mieć ułamki (GameConfig, --set production.farm=6.5) - int64 tylko,
+        # gdy wszystkie wartości są całkowite, inaczej float64 i obcięcie po mnożeniu jak int() w CityGame
+        self.production = {k: np.array([g.production[k] for g in self.games]).astype(
+                               np.int64 if all(isinstance(g.production[k], int) for g in self.games) else np.float64)
+                           for k in ('workshop', 'farm', 'sawmill', 'quarry')}
+        self.better_tools = np.array([bool(g.upgrades.get('better_tools')) for g in self.games])
+        self.manager_prod = np.array([bool(g.upgrades.get('manager_prod')) for g in self.games])
+        self.prestige_points = col('prestige_points')
+        rules = self.games[0].config.rules if self.games else None
+        if any(g.config.rules is not rules for g in self.games): raise ValueError('Miasta w partii muszą mieć te same reguły.')
+        # reguły: bity jak w CityGame (int na miasto) + kolumny kursorów i progów na statystykę
+        self.rules = {'ach': rules.achievements, 'quests': rules.quests} if rules else {}
+        self.done = {'ach': [g._ach for g in self.games], 'quests': [g._quests for g in self.games]}
+        self.watch = {}
+        for kind, t in self.rules.items():
+            w = [t.watch(bits) for bits in self.done[kind]]
+            cur = np.array([c for c, _, _ in w], dtype=np.int64).reshape(n, len(t.stats))
+            thr = np.array([[_NEVER if x == float('inf') else x for x in th] for _, th, _ in w], dtype=np.int64).reshape(n, len(t.stats))
+            self.watch[kind] = (cur, thr)
+        self.last_roll = np.full(n, -1, dtype=np.int64)
+        self._compute_yields()
+
+    # effective_count liczymy skalarnie (math.pow), żeby nie różnić się od CityGame o ulp
+    def _compute_yields(self):
+        eff = np.array([[_effective_count(int(c)) for c in row] for row in self.buildings], dtype=np.int64).reshape(self.buildings.shape)
+        col = {k: eff[:, i] for i, k in enumerate(BUILDING_KEYS)}
+        tool_mult = np.where(self.better_tools, 1.2, 1.0)
+        mgr = 1 + np.minimum(np.where(self.manager_prod, 0.15, 0.0), 0.5)
+        money = np.zeros(len(self.games), dtype=np.int64)
+        for k in ('workshop', 'farm'):
+            base = (self.production[k] * col[k]).astype(np.int64)
+            money += np.trunc(base * tool_mult * mgr).astype(np.int64)
+        money += 2 * col['market']
+        wood = np.trunc((self.production['sawmill'] * col['sawmill']).astype(np.int64) * tool_mult).astype(np.int64)
+        stone = np.trunc((self.production['quarry'] * col['quarry']).astype(np.int64) * tool_mult).astype(np.int64)
+        self.y_money = money
+        self.y_wood = np.trunc(wood * self.prestige_mult).astype(np.int64)
+        self.y_stone = np.trunc(stone * self.prestige_mult).astype(np.int64)
+        school = self.buildings[:, BUILDING_KEYS.index('school')]
+        self.y_happy = self.buildings[:, BUILDING_KEYS.index('pavilion')] + self.buildings[:, BUILDING_KEYS.index('hospital')] + school
+        self.y_research = np.trunc(school * 0.5 * self.prestige_mult).astype(np.int64)
+
+    # rzuty z generatora każdego miasta (rng.take) - ta sama sekwencja co w CityGame.end_day
+    def _roll_block(self, days):
+        return np.array([g.rng.take(days) for g in self.games], dtype=np.int64).reshape(len(self.games), days)
+
+    def production_day(self):
+        base_income = (self.population * self.happiness) // 30
+        total = self.y_money + base_income + (base_income * self.manager_bonus) // 100
+        total_money = np.trunc(total * self.prestige_mult).astype(np.int64)
+        self.money += total_money
+        self.wood += self.y_wood
+        self.stone += self.y_stone
+        self.happiness += self.y_happy
+        self.research += self.y_research
+        self.normalize()
+        return total_money
+
+    def normalize(self):
+        np.maximum(self.wood, 0, out=self.wood)
+        np.maximum(self.stone, 0, out=self.stone)
+        np.clip(self.happiness, 0, 100, out=self.happiness)
+        np.maximum(self.population, 0, out=self.population)
+        np.maximum(self.money, 0, out=self.money)
+
+    def roll_event(self, r):
+        fire = r < 6
+        good = (r >= 6) & (r < 14)
+        mig = (r >= 14) & (r < 22)
+        scandal = (r >= 22) & (r < 26)
+        lost = np.where(fire, np.minimum(20, self.wood), 0)
+        self.wood += np.where(good, 15, 0) - lost
+        self.happiness += np.where(fire, -6, 0) + np.where(mig, 3, 0) + np.where(scandal, -10, 0)
+        self.population += np.where(mig, 5, 0)
+        self.money += np.where(good, 50, 0)
+        self.money -= np.where(scandal, np.minimum(100, self.money), 0)
+        return fire, good, mig, scandal
+
+    def stat_column(self, stat):
+        if stat in STATS:
+            return self.research if stat == 'research_points' else getattr(self, stat)
+        return self.buildings[:, BUILDING_INDEX[stat.partition('.')[2]]]
+
+    def check_achievements(self): self._check_rules('ach')
+    def check_quests(self): self._check_rules('quests')
+
+    def _check_rules(self, kind):
+        # jak CityGame._check_rules: porównanie kolumny z progiem, a tylko miasta, które go
+        # przekroczyły, przechodzą przez reguły skalarnie (zdarza się to rzadko)
+        t = self.rules.get(kind)
+        if not t: return
+        cur, thr = self.watch[kind]; done = self.done[kind]
+        again = True
+        while again:
+            again = False
+            for s, stat in enumerate(t.stats):
+                values = self.stat_column(stat)
+                for i in np.flatnonzero(values >= thr[:, s]):
+                    c, th, hits = t.advance(s, int(values[i]), int(cur[i, s]), done[i])
+                    cur[i, s] = c; thr[i, s] = _NEVER if th == float('inf') else th
+                    for bit in hits:
+                        done[i] |= 1 << bit
+                        rw = t.rewards[bit]
+                        if not rw: continue
+                        self.money[i] += rw.get('money', 0); self.research[i] += rw.get('research', 0)
+                        self.wood[i] += rw.get('wood', 0); self.stone[i] += rw.get('stone', 0)
+                        again = True
+
+    def run(self, days):
+        """Przewija wszystkie miasta o `days` dni. Zwraca sumy produkcji i liczniki wydarzeń na miasto."""
+        n = len(self.games)
+        produced = {k: np.zeros(n, dtype=np.int64) for k in ('money', 'wood', 'stone')}
+        events = {k: np.zeros(n, dtype=np.int64) for k in ('fire', 'good_year', 'migration', 'scandal')}
+        done = 0
+        while done < days:
+            block = min(ROLL_BLOCK, days - done)
+            rolls = self._roll_block(block)
+            for i in range(block):
+                produced['money'] += self.production_day()
+                produced['wood'] += self.y_wood; produced['stone'] += self.y_stone
+                r = rolls[:, i]
+                for key, hit in zip(('fire', 'good_year', 'migration', 'scandal'), self.roll_event(r)):
+                    events[key] += hit
+                self.last_roll = r
+                self.day += 1
+                self.check_achievements(); self.check_quests()
+            done += block
+        events['calm'] = days - sum(events.values())
+        return produced, events
+
+    def to_games(self):
+        """Zapisuje stan kolumn z powrotem do obiektów CityGame."""
+        for i, g in enumerate(self.games):
+            g.day = int(self.day[i]); g.money = int(self.money[i]); g.population = int(self.population[i])
+            g.happiness = int(self.happiness[i]); g.wood = int(self.wood[i]); g.stone = int(self.stone[i])
+            g.research_points = int(self.research[i])
+            if self.rules:
+                g._ach = self.done['ach'][i]; g._quests = self.done['quests'][i]
+                g._awatch = g._qwatch = None
+            if self.last_roll[i] >= 0:
+                g.last_roll = int(self.last_roll[i]); g.last_event = event_key(g.last_roll)
+        return self.games
+
+
+def simulate_batch(games, days, seeds=None):
+    """Symuluje wiele miast naraz; obiekty `games` są aktualizowane na końcu."""
+    batch = CityBatch(games, seeds)
+    produced, events = batch.run(days)
+    batch.to_games()
+    return produced, events
+
+
+def check(n=16, days=300, production=None, seed=0):
+    """Porównuje simulate_batch z simulate() miasto po mieście (losowe budynki, ulepszenia,
+    prestiż; opcjonalnie własna tabela produkcji). Zwraca numery miast, które się różnią."""
+    import random
+    from .game import GameConfig, PRODUCTION
+    from .sim import simulate
+
+    cfg = GameConfig(production={**PRODUCTION, **production}) if production else None
+
+    def city(i):
+        rr = random.Random(seed * 100003 + i)
+        g = CityGame(config=cfg)
+        for k in g.buildings: g.buildings[k] = rr.choice([0, 0, 1, 3, 10, 57, 300])
+        g.upgrades['better_tools'] = rr.random() < .5; g.upgrades['manager_prod'] = rr.random() < .5
+        g.manager_bonus = rr.choice([0, 5, 10]); g.prestige_points = rr.choice([0, 1, 7, 33])
+        g.happiness = rr.randint(0, 100)
+        return g
+
+    seeds = [1000 + i for i in range(n)]
+    scalar = []
+    for i in range(n):
+        g = city(i); simulate(days, seed=seeds[i], game=g); scalar.append(g.to_dict())
+    games = [city(i) for i in range(n)]
+    simulate_batch(games, days, seeds=seeds)
+    return [i for i, g in enumerate(games) if g.to_dict() != scalar[i]]
+
+
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(prog='python -m citycore vecsim', description='Zgodność simulate_batch z simulate().')
+    ap.add_argument('--cities', type=int, default=16)
+    ap.add_argument('--days', type=int, default=300)
+    args = ap.parse_args(argv)
+    # domyślna tabela i tabela z ułamkami (takie daje sweep/planner przez --set production.X=6.5)
+    tables = {'domyślna': None, 'ułamkowa': {'workshop': 10.5, 'farm': 8.3, 'sawmill': 2.7, 'quarry': 1.9}}
+    bad = 0
+    for name, table in tables.items():
+        diff = check(args.cities, args.days, table)
+        print(f'{name}: {args.cities - len(diff)}/{args.cities} zgodnych' + (f' (różne: {diff})' if diff else ''))
+        bad += len(diff)
+    return 1 if bad else 0